@@ -16,7 +16,6 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import sys
-from . import main
 
 if __name__ == "__main__":
 	args = []
@@ -62,6 +61,23 @@ Options and arguments:
                   app.  Useful for debugging issues when something isn't
                   working properly, or while working on the mathinspector
                   source code
+
+--run file       : evaluates the node editor of the .math file without
+                  launching the app, and prints the results
+                    e.g. mathinspector --run project.math --output y
+
+--output names   : a comma separated list of the items to evaluate with
+                  --run, defaults to every item that isn't plugged into
+                  another item
+
+--save file      : saves the results of --run to a .npz file, or pickles
+                  them for any other extension
 		""")
+	elif "run" in kwargs:
+		from .headless import run
+		sys.exit(run(kwargs["run"],
+			output=kwargs["output"] if "output" in kwargs else None,
+			save=kwargs["save"] if "save" in kwargs else None))
 	else:
+		from .app import main
 		main(*args, **kwargs)
@@ -16,22 +16,26 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
-import inspect, sys, traceback, os, re
+import inspect, sys, traceback, os, re, dis, threading, cProfile
 import numpy as np
 import tkinter as tk
 from code import InteractiveInterpreter
 from types import CodeType
 from io import TextIOWrapper
+from collections import deque
 
 from ..plot import plot
 from ..doc import Help
 from ..style import Color, TAGS
-from ..util import vdict
+from ..util.timing import timeit, ProfileStats
+from ..util.common import classname
+from ..node.preview import preview, is_summarized
 from ..config import open_editor, BUTTON_RIGHT, BASEPATH, FONT, __version__
 from ..widget import Text, Menu
 from .builtin_print import builtin_print
 from .codeparser import CodeParser
 from .prompt import Prompt, FONTSIZE
+from .kernel import Kernel
 
 RE_TRACEBACK = r"^()(Traceback \(most recent call last\))"
 RE_EXCEPTION = r"^()([A-Za-z]*Error:)"
@@ -39,24 +43,29 @@ RE_FILEPATH = r"(File (\"(?!<).*\"))"
 RE_INPUT = r"(File \"(<.*>)\")"
 RE_LINE = r"((line [0-9]*))"
 RE_IN = r"line ([0-9]*), in (.*)"
+FLUSH_DELAY = 30 # ms, writes to stdout and stderr are inserted into the console at most this often
+SCROLLBACK = 10000 # the number of lines kept in the console
+TRIM_LINES = 1000 # old lines are deleted once there are this many more lines than SCROLLBACK
+ELIDE_CHARS = 10000 # output longer than this is collapsed, and expanded when it is clicked
+ELIDE_LINES = 200 # the same, for output with more lines than this
 
 class Interpreter(Text, InteractiveInterpreter):
 	"""
 	This class extends `InteractiveInterpreter` from the module `code`,
 	and follows the official patterns for creating python interpreters.
 
-	In order to synchronize all the different views with the interpreter, the local namespace
-	is stored in a vdict called `self.locals`.  A vdict is key-value pair, just like a regular
-	dictionary, except it also has callbacks for events such as setting and deleting items.
-
-	When running commands, `self.locals` is passed to the builtin `exec` function as the second parameter.
-	This parameter determines the local namespace exec runs in.  You can display the current
-	contents of the local namespace by running the command
+	The local namespace is stored in a plain dictionary called `self.locals`, which is passed
+	to the builtin `exec` function as the second parameter.  This parameter determines the local
+	namespace exec runs in.  You can display the current contents of the local namespace by
+	running the command
 
 	>>> locals()
 
-	When exec processses code, it updates the values in `self.locals`, but since this is a vdict,
-	the callbacks are automatically triggered.
+	Since `self.locals` is a regular dict, code run in the console looks up variables at the
+	same speed as any other python code.  In order to synchronize all the different views with
+	the interpreter, the namespace is compared against a snapshot taken before each command,
+	and the objects and modules which were assigned, replaced or deleted are passed on to
+	`app.objects` and `app.modules` once the command has finished.
 
 	The math inspector console extends the traditional python interpreter, and has many quality of
 	life improvements such as syntax highlighting and a wide variety of hotkeys. Before and
@@ -68,13 +77,19 @@ class Interpreter(Text, InteractiveInterpreter):
 
 	An excellent resource for learning about abstract syntax tree's is the
 	website https://greentreesnakes.readthedocs.io/
+
+	Only the last SCROLLBACK lines of output are kept, which can be changed with
+
+	>>> app.console.scrollback = 50000
+
+	Very long outputs are collapsed, and the rest of the output is shown when it is clicked
 	"""
 	def __init__(self, app, disable=()):
-		InteractiveInterpreter.__init__(self, vdict({
+		InteractiveInterpreter.__init__(self, {
 			"__builtins__": __builtins__,
 			"app": app,
 			"plot": plot
-		}, setitem=self.setitem, delitem=self.delitem))
+		})
 
 		self.frame = tk.Frame(app,
 			padx=16,
@@ -93,6 +108,7 @@ class Interpreter(Text, InteractiveInterpreter):
 
 		if "print" not in disable:
 			sys.stdout = StdWrap(sys.stdout, self) # stderr is overriden in __init__:main
+			sys.displayhook = self.displayhook
 
 		self.disable_traceback = "traceback" in disable
 		if not self.disable_traceback:
@@ -103,11 +119,19 @@ class Interpreter(Text, InteractiveInterpreter):
 		__builtins__["license"] = License()
 		__builtins__["copyright"] = Copyright()
 		__builtins__["credits"] = Credits()
+		__builtins__["timeit"] = Timeit(self)
+		__builtins__["profile"] = Profile(self)
 
 		self.app = app
 		self.prompt = Prompt(self, self.frame)
 		self.parse = CodeParser(app)
 		self.buffer = []
+		self.synced = 0, 0 # the versions of app.objects and app.modules in self.locals
+		self.pending = deque() # writes to stdout and stderr which haven't been inserted yet, from any thread
+		self.flush_id = None
+		self.scrollback = SCROLLBACK
+		self.kernel = None
+		self.elided = {} # tag -> the text, or a function which formats it, shown when the tag is clicked
 		self.prevent_module_import = False
 		self.cursor_position = self.index("end")
 
@@ -116,7 +140,7 @@ class Interpreter(Text, InteractiveInterpreter):
 		self.bind("<ButtonRelease-1>", self.on_click_log)
 		self.pack(fill="both", expand=True)
 
-		for i in ["error_file"]:
+		for i in ["error_file", "elided"]:
 			self.tag_bind(i, "<Motion>", lambda event, key=i: self._motion(event, key))
 			self.tag_bind(i, "<Leave>", lambda event, key=i: self._leave(event, key))
 			self.tag_bind(i, "<Button-1>", lambda event, key=i: self._click(event, key))
@@ -145,17 +169,58 @@ class Interpreter(Text, InteractiveInterpreter):
 
 	def delitem(self, key, value):
 		if inspect.ismodule(value):
-			del self.app.modules[key]
-		else:
+			if key in self.app.modules:
+				del self.app.modules[key]
+		elif key in self.app.objects:
 			del self.app.objects[key]
 
 	def synclocals(self):
-		self.locals.store.update(self.app.objects.store)
-		self.locals.store.update(self.app.modules.store)
+		"""
+		copies the objects and modules which have been set or deleted since the last call into
+		the namespace, using the change journal of app.objects and app.modules
+		"""
+		objects, modules = self.app.objects.store, self.app.modules.store
+		keys = objects.changed(self.synced[0]) + modules.changed(self.synced[1])
+		self.synced = objects.version, modules.version
+		for key in keys:
+			if key in modules:
+				self.locals[key] = modules[key]
+			elif key in objects:
+				self.locals[key] = objects[key]
+			else:
+				self.locals.pop(key, None)
+
+	def commit(self, snapshot, names=()):
+		"""
+		calls setitem for every variable in `names`, or which is new or has a different value
+		than in snapshot, and delitem for every variable which has been deleted since snapshot
+		"""
+		for key in list(self.locals):
+			value = self.locals[key]
+			if key in names or key not in snapshot or snapshot[key] is not value:
+				self.setitem(key, value)
+
+		for key in snapshot:
+			if key not in self.locals:
+				self.delitem(key, snapshot[key])
+
+	def runcode(self, code):
+		snapshot = dict(self.locals)
+		try:
+			InteractiveInterpreter.runcode(self, code)
+		finally:
+			self.flush()
+			self.commit(snapshot, stored_names(code))
 
 	def eval(self, source):
+		if self.kernel:
+			return self.kernel.evaluate(source)
 		self.synclocals()
-		return eval(source, self.locals)
+		snapshot = dict(self.locals)
+		try:
+			return eval(source, self.locals)
+		finally:
+			self.commit(snapshot)
 
 	def exec(self, source, filename="<file>"):
 		self.prevent_module_import = True
@@ -171,14 +236,12 @@ class Interpreter(Text, InteractiveInterpreter):
 		self.synclocals()
 		source = "".join(self.buffer + [s])
 		self.parse.preprocess(source)
-		if source[:3] == "del" and source[4:] in self.app.objects:
-			# NOTE - there is a strange issue with exec where it can't delete things from self.locals
-			del self.app.objects[source[4:]]
-			self.prompt()
-			return
-		elif source[:4] == "plot":
+		if source[:4] == "plot":
 			self.prompt()
-		did_compile = self.runsource(source, filename, symbol)
+		if self.kernel:
+			did_compile = self.runremote(source, filename, symbol)
+		else:
+			did_compile = self.runsource(source, filename, symbol)
 
 		if did_compile:
 			self.buffer.append(s + "\n")
@@ -189,8 +252,79 @@ class Interpreter(Text, InteractiveInterpreter):
 			self.buffer.clear()
 		self.prompt()
 
-	def write(self, *args, syntax_highlight=False, tags=(), **kwargs):
+	def runremote(self, source, filename="<input>", symbol="single"):
+		""" the same as runsource, except the code is run in the kernel """
+		try:
+			code = self.compile(source, filename, symbol)
+		except (OverflowError, SyntaxError, ValueError):
+			self.showsyntaxerror(filename)
+			return False
+
+		if code is None:
+			return True
+		self.kernel.execute(source, filename, symbol)
+		return False
+
+	def start_kernel(self):
+		"""
+		runs the commands typed in the console in a separate process, see console/kernel.py.
+		Files in the Modules tab and the node editor still run in the app
+		"""
+		if not self.kernel:
+			self.kernel = Kernel(self)
+
+	def stop_kernel(self):
+		if self.kernel:
+			self.kernel.stop()
+			self.kernel = None
+			self.prompt.indicator()
+
+	def queue(self, s):
+		"""
+		called for every write to stdout and stderr.  The text is buffered and inserted by flush
+		from a timer, at most every FLUSH_DELAY ms.  Tk can only be used from the main thread, so
+		writes from other threads are only appended to the buffer, and are inserted by the next
+		flush on the main thread
+		"""
+		if self.prevent_module_import: return
+		self.pending.append(s)
+		if not self.flush_id and threading.current_thread() is threading.main_thread():
+			self.flush_id = self.after(FLUSH_DELAY, self.flush)
+
+	def flush(self):
+		""" inserts all the pending output at once, so it is only highlighted a single time """
+		if self.flush_id:
+			self.after_cancel(self.flush_id)
+			self.flush_id = None
+		if not self.pending: return
+
+		# each write is elided on its own, so a loop printing many short lines is never collapsed
+		text = ""
+		while self.pending:
+			head, rest = elide(self.pending.popleft())
+			text += head
+			if rest:
+				self.write(text, collapsed=rest[:-1] if rest[-1:] == "\n" else rest)
+				text = ""
+		if text:
+			self.write(text[:-1] if text[-1:] == "\n" else text, collapsed="")
+
+	def displayhook(self, value):
+		"""
+		shows the result of a command.  Only a bounded preview of large values is formatted, and the
+		whole value is formatted when the preview is clicked
+		"""
+		if value is None: return
+		__builtins__["_"] = value
+		if is_summarized(value):
+			self.write(preview(value), collapsed=lambda: repr(value))
+		else:
+			self.write(repr(value))
+
+	def write(self, *args, syntax_highlight=False, tags=(), collapsed=None, **kwargs):
 		if self.prevent_module_import: return
+		if self.pending:
+			self.flush()
 
 		if len(args) == 1:
 			if isinstance(args[0], np.ndarray):
@@ -213,7 +347,11 @@ class Interpreter(Text, InteractiveInterpreter):
 			if r is not None:
 				if isinstance(r, Exception):
 					tags = tuple(list(tags) + ["red"])
-				self.insert("end", str(r), tags, syntax_highlight=syntax_highlight)
+				head, rest = (str(r), collapsed) if collapsed is not None else elide(str(r))
+				start = self.index("end-1c")
+				self.insert("end", head, tags, syntax_highlight=syntax_highlight)
+				if rest:
+					self.collapse(rest, tags, start)
 				if len(args) > 1:
 					self.insert("end", "\t")
 
@@ -228,9 +366,49 @@ class Interpreter(Text, InteractiveInterpreter):
 		if self.get("1.0", "end").strip():
 			self.insert("end", "\n")
 
+		self.trim()
 		self.see("end")
 		self.prompt.move()
 
+	def collapse(self, text, tags=(), start=None):
+		"""
+		inserts a link which is replaced with text when it is clicked.  When text is a function, it
+		is only called once the link is clicked, and the text replaces everything from `start`
+		"""
+		key = "elided=" + str(id(text))
+		self.elided[key] = text, tags
+		if callable(text):
+			self.mark_set(key, start)
+			self.mark_gravity(key, "left")
+			label = " ... (click to show the whole value)"
+		else:
+			lines = text.count("\n")
+			label = " ... (" + (str(lines) + " more lines" if lines else str(len(text)) + " more characters") + ", click to expand)"
+		self.insert("end", label, ("elided", key))
+
+	def expand(self, key):
+		start, end = self.tag_ranges(key)
+		text, tags = self.elided.pop(key)
+		if callable(text):
+			start, text = self.index(key), text()
+			self.mark_unset(key)
+		self.hover_range = None
+		self.delete(start, end)
+		self.insert(start, text, tags)
+
+	def trim(self):
+		""" deletes the oldest lines of output, TRIM_LINES at a time, to keep the last `scrollback` lines """
+		lines = int(self.index("end-1c").split(".")[0])
+		if lines <= self.scrollback + TRIM_LINES: return
+
+		count = lines - self.scrollback
+		self.delete("1.0", str(count + 1) + ".0")
+		line, col = self.cursor_position.split(".")
+		self.cursor_position = str(max(1, int(line) - count)) + "." + col
+		for key in [i for i in self.elided if not self.tag_ranges(i)]:
+			del self.elided[key]
+			self.mark_unset(key)
+
 	def showtraceback(self, *args):
 		if self.disable_traceback:
 			ei = sys.exc_info()
@@ -282,6 +460,24 @@ class Interpreter(Text, InteractiveInterpreter):
 		content = self.get(*self.hover_range)
 		if tag == "error_file":
 			open_editor(self.app, os.path.abspath(content[1:-1]))
+		elif tag == "elided":
+			for key in self.tag_names(self.hover_range[0]):
+				if key in self.elided:
+					self.expand(key)
+
+
+def elide(text):
+	""" splits text into the part which is shown in the console, and the part which is collapsed """
+	head = text[:ELIDE_CHARS]
+	lines = head.split("\n", ELIDE_LINES)
+	if len(lines) > ELIDE_LINES:
+		head = "\n".join(lines[:ELIDE_LINES])
+	return head, text[len(head):]
+
+
+def stored_names(code):
+	""" the names assigned by code, which includes in place operations such as `x += 1` on an ndarray """
+	return { i.argval for i in dis.get_instructions(code) if i.opname in ("STORE_NAME", "STORE_GLOBAL") }
 
 
 class StdWrap(TextIOWrapper):
@@ -293,8 +489,66 @@ class StdWrap(TextIOWrapper):
 		self.interpreter = interpreter
 
 	def write(self, s, **kwargs):
-		self.interpreter.write(s)
-		self.interpreter.app.update()
+		self.interpreter.queue(s)
+		return len(s)
+
+class Timeit:
+	"""
+	times a statement, which is run in the namespace of the console, or a function
+
+	>>> timeit("np.sort(x)")
+	>>> timeit(lambda: np.sort(x))
+	"""
+	def __init__(self, console):
+		self.console = console
+
+	def __call__(self, stmt):
+		self.console.synclocals()
+		return timeit(stmt, globals=self.console.locals)
+
+	def __repr__(self):
+		return "Type timeit(statement) or timeit(function) to measure how long it takes to run"
+
+class Profile:
+	"""
+	runs a statement, a function, or an item in the node editor with cProfile, and shows the
+	functions which took the most time in the doc browser
+
+	>>> profile("np.linalg.eig(A)")
+	>>> profile(fn, x)
+	>>> profile("y") # y is the name of an item in the node editor
+	"""
+	def __init__(self, console):
+		self.console = console
+
+	def __call__(self, target, *args, **kwargs):
+		node = self.console.app.node
+		profiler = cProfile.Profile()
+		if callable(target):
+			name = getattr(target, "__name__", classname(target))
+			profiler.runcall(target, *args, **kwargs)
+		elif not isinstance(target, str):
+			raise TypeError("profile expects a statement, a function or the name of an item, not " + classname(target))
+		elif target in node:
+			# every item plugged into the item is recomputed, instead of using the cached values
+			name = target
+			items = [node[target]]
+			while items:
+				item = items.pop()
+				item.invalidate()
+				items.extend(node.scheduler.upstream(item))
+			profiler.runcall(node[target].value)
+		else:
+			name = target
+			self.console.synclocals()
+			profiler.runctx(target, self.console.locals, self.console.locals)
+
+		stats = ProfileStats(profiler, "profile " + name)
+		help(stats, "profile " + name)
+		return stats
+
+	def __repr__(self):
+		return "Type profile(statement), profile(function, *args) or profile(item name) to see where the time is spent"
 
 class Copyright:
 	def __repr__(self):
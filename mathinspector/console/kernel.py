@@ -0,0 +1,326 @@
+"""
+Runs the commands typed in the console in a separate process
+
+Normally everything typed in the console runs in the same process as the app, so a
+long computation blocks the whole app until it is finished.  When the kernel is started,
+commands are sent to a child process which owns its own namespace, and the app stays
+responsive while they run.
+
+>>> app.console.start_kernel()
+
+A running command can be stopped with Kernel > Interrupt in the main menu, or with
+
+>>> app.console.kernel.interrupt()
+
+and the kernel can be restarted with a fresh namespace with
+
+>>> app.console.kernel.restart()
+
+The variables created in the kernel are shown in the Objects tab and the node editor as
+a `Proxy`, which only contains the class name and a short preview of the value.  The
+value itself is copied into the app when it's needed
+
+>>> app.objects["x"].value()
+
+Values which are edited in the Objects tab or the node editor are evaluated in the kernel,
+and copied back into it.  The `timeit` and `profile` commands also work in the kernel, except
+profile can't be used on the items in the node editor.
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import sys, os, dis, signal, builtins, importlib, inspect, threading, traceback, queue, pickle, tempfile, cProfile
+import multiprocessing as mp
+from ..config import MULTIPROCESS_CONTEXT, SYSTEM
+from ..util.common import classname
+from ..util.timing import timeit, ProfileStats
+
+POLL_INTERVAL = 20 # milliseconds between checks for messages from the kernel
+
+class Kernel:
+	"""
+	The app side of the connection to the kernel process.  Messages are tuples sent over a
+	pipe, where the first element is the type of message
+	"""
+	def __init__(self, console):
+		self.console = console
+		self.app = console.app
+		self.conn = None
+		self.process = None
+		self.is_busy = False
+		self.count = 0 # the number of commands which haven't finished yet
+		self.after_id = None
+		self.start()
+
+	def start(self):
+		context = mp.get_context(MULTIPROCESS_CONTEXT)
+		self.conn, child = context.Pipe()
+		self.process = context.Process(target=serve, args=(child,), daemon=True)
+		self.process.start()
+		child.close()
+		self.count = 0
+		self.busy(False)
+		self.poll()
+
+	def stop(self):
+		if self.after_id:
+			self.console.after_cancel(self.after_id)
+			self.after_id = None
+		if self.process.is_alive():
+			self.process.terminate()
+		self.process.join()
+		self.conn.close()
+		for name in [i for i in self.app.objects if isinstance(self.app.objects.store[i], Proxy)]:
+			del self.app.objects[name]
+		self.busy(False)
+
+	def restart(self):
+		self.stop()
+		self.start()
+
+	def interrupt(self):
+		""" raises KeyboardInterrupt in the command which is running, on windows this restarts the kernel instead """
+		if not self.is_busy: return
+		if SYSTEM == "Windows":
+			self.restart()
+			self.console.write("KeyboardInterrupt: the kernel has been restarted", tags="red")
+		else:
+			os.kill(self.process.pid, signal.SIGINT)
+
+	def execute(self, source, filename="<input>", symbol="single"):
+		self.count += 1
+		self.busy(True)
+		self.conn.send(("exec", source, filename, symbol))
+
+	def fetch(self, name):
+		""" copies the value of the variable `name` from the kernel into the app """
+		return self.request("fetch", name)
+
+	def evaluate(self, source):
+		""" evaluates an expression in the namespace of the kernel, and copies the result into the app """
+		return self.request("eval", source)
+
+	def assign(self, name, value):
+		""" sets the variable `name` in the kernel, once the command which is running has finished """
+		try:
+			self.conn.send(("set", name, value))
+		except Exception as err:
+			print (Exception("KernelError: " + name + " can't be copied into the kernel, " + str(err)))
+
+	def request(self, *message):
+		"""
+		sends a request which is answered by the kernel right away, even while a command is running.
+		The pipe is also read by poll, so this can only be called from the main thread
+		"""
+		if threading.current_thread() is not threading.main_thread():
+			raise RuntimeError("KernelError: values can only be copied from the kernel on the main thread")
+		self.conn.send(message)
+		while True:
+			message = self.conn.recv()
+			if message[0] == "value":
+				if isinstance(message[1], Exception):
+					raise message[1]
+				return message[1]
+			self.dispatch(message)
+
+	def poll(self):
+		try:
+			while self.conn.poll():
+				self.dispatch(self.conn.recv())
+		except (EOFError, OSError, pickle.UnpicklingError) as err:
+			self.console.write("The kernel has stopped (" + (str(err) or classname(err)) + "), restarting...", tags="red")
+			self.restart()
+			return
+		self.after_id = self.console.after(POLL_INTERVAL, self.poll)
+
+	def dispatch(self, message):
+		key = message[0]
+		if key == "write":
+			self.console.queue(message[1])
+		elif key == "error":
+			self.console.write(message[1], tags="red")
+		elif key == "profile":
+			name, path = message[1:]
+			stats = ProfileStats(path, "profile " + name)
+			os.remove(path)
+			help(stats, "profile " + name)
+		elif key == "done":
+			self.update(*message[1:])
+			self.count = max(0, self.count - 1)
+			if self.count == 0:
+				self.busy(False)
+
+	def update(self, changed, deleted):
+		"""
+		modules imported in the kernel are imported into the app as well, so they can be
+		browsed in the Modules tab.  Everything else becomes a Proxy
+		"""
+		for name in changed:
+			module, classname, text = changed[name]
+			if module:
+				try:
+					self.app.modules[name] = importlib.import_module(module)
+				except Exception as err:
+					pass
+			else:
+				self.app.objects[name] = Proxy(self, name, classname, text)
+
+		for name in deleted:
+			if name in self.app.objects:
+				del self.app.objects[name]
+			elif name in self.app.modules:
+				del self.app.modules[name]
+
+	def busy(self, is_busy=True):
+		self.is_busy = is_busy
+		self.console.prompt.indicator()
+
+
+class Proxy:
+	"""
+	Stands in for a variable which lives in the kernel process.  It only contains the class name
+	and a preview of the value, the value itself is copied from the kernel the first time value()
+	is called.  A new Proxy is created whenever the variable changes, so the copy is kept
+	"""
+	def __init__(self, kernel, name, classname, text):
+		self.kernel = kernel
+		self.name = name
+		self.classname = classname
+		self.text = text
+		self.is_fetched = False
+		self.fetched = None
+
+	def value(self):
+		if not self.is_fetched:
+			self.fetched = self.kernel.fetch(self.name)
+			self.is_fetched = True
+		return self.fetched
+
+	def __repr__(self):
+		return self.text
+
+
+def serve(conn):
+	"""
+	the main loop of the kernel process.  Commands are run one at a time on the main thread, so
+	that SIGINT interrupts them, while a second thread answers requests for values
+	"""
+	from ..node.preview import preview
+
+	lock = threading.Lock()
+	jobs = queue.Queue()
+	namespace = { "__builtins__": builtins }
+	interrupted = [] # a SIGINT which arrived while a message was being sent
+
+	def send(*message):
+		with lock:
+			conn.send(message)
+		if interrupted and threading.current_thread() is threading.main_thread():
+			interrupted.clear()
+			raise KeyboardInterrupt
+
+	def on_interrupt(signum, frame):
+		# raising in the middle of conn.send would leave half a message in the pipe
+		if lock.locked():
+			interrupted.append(signum)
+		else:
+			raise KeyboardInterrupt
+
+	def profile(target, *args, **kwargs):
+		profiler = cProfile.Profile()
+		if callable(target):
+			name = getattr(target, "__name__", classname(target))
+			profiler.runcall(target, *args, **kwargs)
+		else:
+			name = target
+			profiler.runctx(target, namespace, namespace)
+		fd, path = tempfile.mkstemp(suffix=".prof")
+		os.close(fd)
+		profiler.dump_stats(path)
+		send("profile", name, path)
+
+	def listen():
+		while True:
+			try:
+				message = conn.recv()
+			except (EOFError, OSError):
+				jobs.put(None)
+				return
+			if message[0] in ("fetch", "eval"):
+				try:
+					send("value", namespace[message[1]] if message[0] == "fetch" else eval(message[1], namespace))
+				except Exception as err:
+					send("value", err)
+			else:
+				jobs.put(message)
+
+	def describe(value):
+		if inspect.ismodule(value):
+			return value.__name__, None, None
+		try:
+			return None, classname(value), preview(value)
+		except Exception as err:
+			return None, type(value).__name__, "<" + type(value).__name__ + ">"
+
+	def run(source, filename, symbol):
+		snapshot = dict(namespace)
+		names = set()
+		try:
+			code = compile(source, filename, symbol)
+			names = { i.argval for i in dis.get_instructions(code) if i.opname in ("STORE_NAME", "STORE_GLOBAL") }
+			exec(code, namespace)
+		except BaseException as err:
+			ei = sys.exc_info()
+			send("error", "".join(traceback.format_exception(ei[0], ei[1], ei[2].tb_next)).rstrip())
+		finally:
+			sys.stdout.flush()
+			changed = { key: describe(namespace[key]) for key in namespace
+				if key != "__builtins__" and (key in names or key not in snapshot or snapshot[key] is not namespace[key]) }
+			deleted = [key for key in snapshot if key not in namespace]
+			send("done", changed, deleted)
+
+	signal.signal(signal.SIGINT, on_interrupt)
+	sys.stdout = sys.stderr = Writer(send)
+	builtins.timeit = lambda stmt: timeit(stmt, globals=namespace)
+	builtins.profile = profile
+	threading.Thread(target=listen, daemon=True).start()
+
+	while True:
+		try:
+			message = jobs.get()
+			if message is None:
+				return
+			if message[0] == "set":
+				namespace[message[1]] = message[2]
+			else:
+				run(*message[1:])
+		except KeyboardInterrupt:
+			# the interrupt came in after the command finished, the app ignores the extra "done"
+			send("done", {}, [])
+
+
+class Writer:
+	""" sends everything written to stdout and stderr in the kernel to the console """
+	def __init__(self, send):
+		self.send = send
+
+	def write(self, s):
+		if s:
+			self.send("write", s)
+		return len(s)
+
+	def flush(self):
+		pass
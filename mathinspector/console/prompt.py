@@ -51,13 +51,23 @@ class Prompt(Text):
 
 	def __call__(self):
 		self.delete("1.0", "end")
-		self.insert("end", "...  " if self.console.buffer else ">>>  ", "console_prompt")
+		self.insert("end", self.prefix(), "console_prompt")
 		self.console.see("end")
 		self.move()
 		self.focus()
 		self.edit_reset() # NOTE: this resets the tkinter undo stack
 		self.config(insertbackground=Color.WHITE)
 
+	def prefix(self):
+		if self.console.kernel and self.console.kernel.is_busy:
+			return "[*]  "
+		return "...  " if self.console.buffer else ">>>  "
+
+	def indicator(self):
+		""" shows [*] in place of >>> while the kernel is running a command """
+		self.delete("1.0", "1.5")
+		self.insert("1.0", self.prefix(), "console_prompt")
+
 	def get(self, start="1.5", end="end-1c"):
 		return super(Prompt, self).get(start, end)
 
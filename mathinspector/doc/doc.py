@@ -29,6 +29,8 @@ from ..util import EXCLUDED_MODULES, INSTALLED_PKGS, BUILTIN_PKGS
 from .show_functiondoc import show_functiondoc
 from .show_textfile import show_textfile
 from .show_markdown import show_markdown
+from .show_profile import show_profile
+from ..util.timing import ProfileStats
 from numpy import ufunc
 
 class Doc(tk.Frame):
@@ -81,7 +83,7 @@ class Doc(tk.Frame):
 		self.tree.tag_bind("class", "<ButtonRelease-1>", self._on_button_release_1)
 		self.tree.bind("<<TreeviewSelect>>", self._on_select)
 
-		for i in ("link_url", "doc_link", "code_sample", "submodule"):
+		for i in ("link_url", "doc_link", "code_sample", "submodule", "profile_sort", "profile_function"):
 			self.text.tag_bind(i, "<Motion>", lambda event, key=i: self.text._motion(event, key))
 			self.text.tag_bind(i, "<Leave>", lambda event, key=i: self.text._leave(event, key))
 			self.text.tag_bind(i, "<Button-1>", lambda event, key=i: self._click(event, key))
@@ -158,25 +160,21 @@ class Doc(tk.Frame):
 
 		if self.classes:
 			classes = self.tree.insert("", "end", text="classes", open=True)
-			for k in self.classes:
-				temp = self.tree.insert(classes, "end", k, text=k, tags="class")
+			self.tree.insert_rows(classes, [{ "iid": k, "text": k, "tags": "class" } for k in self.classes])
 
 		if self.builtins:
 			if inspect.isclass(self.obj):
 				parent = self.tree.insert("", "end", text="methods", open=True)
 			else:
 				parent = self.tree.insert("", "end", text="builtins", open=True)
-			for j in self.builtins:
-				self.tree.insert(parent, "end", j, text=j)
+			self.tree.insert_rows(parent, [{ "iid": j, "text": j } for j in self.builtins])
 
 		if self.functions:
 			functions = self.tree.insert("", "end", text="functions", open=True)
-			for j in self.functions:
-				self.tree.insert(functions, "end", j, text=j, open=True)
+			self.tree.insert_rows(functions, [{ "iid": j, "text": j } for j in self.functions])
 
 		if self.submodules:
-			for i in self.submodules:
-				self.tree.insert("", "end", i, image=getimage(".py"), text="      " + i, tags="submodule")
+			self.tree.insert_rows("", [{ "iid": i, "image": getimage(".py"), "text": "      " + i, "tags": "submodule" } for i in self.submodules])
 
 		if self.has_sidebar:
 			if not self.builtins and not self.functions and not self.classes and not self.submodules:
@@ -190,6 +188,10 @@ class Doc(tk.Frame):
 		self.display_doc(obj)
 
 	def display_doc(self, obj):
+		if isinstance(obj, ProfileStats):
+			show_profile(self.text, obj)
+			return
+
 		if inspect.ismodule(obj) or inspect.isclass(obj):
 			show_textfile(self.text, inspect.getdoc(obj))
 			return
@@ -279,6 +281,16 @@ class Doc(tk.Frame):
 					self.run_code(command[1])
 			else:
 				self._runcode(match)
+		elif tag in ("profile_sort", "profile_function"):
+			for i in self.text.get_tags(*self.text.hover_range):
+				if i[:5] == "sort=":
+					self.obj.sort = i[5:]
+				elif i[:9] == "function=":
+					self.obj.selected = self.obj.shown[int(i[9:])]
+			self.text.hover_range = None
+			self.text.delete("1.0", "end")
+			self.display_doc(self.obj)
+			self.text.see("1.0")
 
 
 	def _click_nav(self, event, tag):
@@ -0,0 +1,53 @@
+"""
+Math Inspector: a visual programming environment for scientific computing
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from ..util.timing import COLUMNS, label, format_row
+
+MAX_ROWS = 100
+
+def show_profile(text, stats):
+    """
+    displays a ProfileStats as a table of the functions which took the most time.  The column
+    names have the tag sort=<column> and the functions have the tag function=<index in stats.shown>
+    """
+    stats.shown = []
+    text.insert("end", stats.__name__ + "\n", "name")
+    text.insert("end", "{} function calls in {:.3f} seconds\n\n".format(stats.stats.total_calls, stats.stats.total_tt))
+
+    if stats.selected:
+        text.insert("end", label(stats.selected) + "\n", "section_title")
+        for title, rows in (("called by", stats.callers(stats.selected)), ("calls", stats.callees(stats.selected))):
+            text.insert("end", title + "\n", "see_also_title")
+            show_rows(text, stats, sorted(rows.items(), key=lambda row: row[1][3], reverse=True))
+            text.insert("end", "\n")
+        text.insert("end", "all functions\n", "section_title")
+
+    for column in COLUMNS:
+        tags = ("profile_table", "profile_sort", "sort=" + column)
+        text.insert("end", column, tags + (("profile_sorted",) if column == stats.sort else ()))
+        text.insert("end", "\t", "profile_table")
+    text.insert("end", "\n", "profile_table")
+    show_rows(text, stats, stats.rows()[:MAX_ROWS])
+
+
+def show_rows(text, stats, rows):
+    for fn, values in rows:
+        *columns, name = format_row(fn, values).split("\t")
+        text.insert("end", "\t".join(columns) + "\t", "profile_table")
+        text.insert("end", name, ("profile_table", "profile_function", "function=" + str(len(stats.shown))))
+        text.insert("end", "\n", "profile_table")
+        stats.shown.append(fn)
@@ -230,6 +230,33 @@ DOC_TAGS = {
 
     "list_number": {
         "font": "Arial 16 Bold"
+    },
+
+    "profile_table": {
+        "font": "Monospace " + FONT_SIZE["small"],
+        "tabs": ("2.5c", "5c", "7.5c", "10c"),
+        "lmargin1": 16,
+        "lmargin2": 16
+    },
+
+    "profile_sort": {
+        "foreground": Color.BLUE
+    },
+
+    "profile_sort_hover": {
+        "foreground": Color.LINK_URL
+    },
+
+    "profile_sorted": {
+        "foreground": Color.ORANGE
+    },
+
+    "profile_function": {
+        "foreground": Color.WHITE
+    },
+
+    "profile_function_hover": {
+        "foreground": Color.ORANGE
     }
 }
 
@@ -0,0 +1,152 @@
+"""
+Evaluates the node editor graph of a .math project without a display
+
+The items in the node editor, and how they are connected, are saved in the .math
+file along with the objects they reference.  This module loads that structure into a
+plain python model which is evaluated the same way as the node editor does it, without
+importing tkinter, pygame or OpenGL.  This makes it possible to run a pipeline built in
+the app as a batch job on a server.
+
+>>> python -m mathinspector --run project.math --output y --save y.npz
+
+When no output is given, every item in the node editor which isn't plugged into another
+item is evaluated.  When `--save` is omitted, the results are printed instead.
+
+The same thing can be done from python
+
+>>> from mathinspector.headless import Graph
+>>> graph = Graph("project.math")
+>>> graph.value("y")
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import sys, os, pickle
+
+class Graph:
+	"""
+	The items saved in a .math file, where each item has the name of an object, the values
+	of its arguments, and the (name, argname) of the item its output is plugged into
+	"""
+	def __init__(self, file):
+		self.objects = {}
+		self.itemdata = {}
+		self.inputs = {}
+		self.cache = {}
+		self.load(file)
+
+	def load(self, file):
+		# functions defined in the project's own .py files are pickled by reference
+		sys.path.insert(0, os.path.dirname(os.path.abspath(file)))
+		with open(file, "rb") as f:
+			data = { i["name"]: i["value"] for i in pickle.load(f) }
+
+		self.objects = data["objects"] if "objects" in data else {}
+		self.itemdata = data["itemdata"] if "itemdata" in data else {}
+		self.inputs = {}
+		self.cache = {}
+		for name in self.itemdata:
+			connection = self.itemdata[name]["connection"]
+			if connection:
+				output_name, argname = connection
+				self.inputs.setdefault(output_name, {})[argname] = name
+
+	def outputs(self):
+		""" returns the name of every item which isn't plugged into another item """
+		return [i for i in self.itemdata if not self.itemdata[i]["connection"]]
+
+	def value(self, name, path=()):
+		"""
+		returns the value of the item `name`, evaluating everything plugged into it first.  Just
+		like the node editor, a function which is missing arguments or raises an exception
+		evaluates to the function itself
+		"""
+		if name in self.cache:
+			return self.cache[name]
+		if name not in self.objects:
+			raise Exception("NodeEditorError: there is no item named '" + name + "'")
+		if name in path:
+			raise Exception("NodeEditorError: cycle detected between " + ", ".join(path))
+
+		obj = self.objects[name]
+		item = self.itemdata[name] if name in self.itemdata else { "args": {}, "kwargs": {} }
+		inputs = self.inputs[name] if name in self.inputs else {}
+		connected = { key: self.value(inputs[key], path + (name,)) for key in inputs }
+
+		if not callable(obj):
+			result = castarg(obj, connected["<value>"]) if "<value>" in connected else obj
+		else:
+			args = [connected[j] if j in connected else item["args"][j] for j in item["args"]]
+			kwargs = {}
+			for k in item["kwargs"]:
+				value = connected[k] if k in connected else item["kwargs"][k]
+				if value is not None:
+					kwargs[k] = value
+
+			result = obj
+			if not any(i is None for i in args):
+				try:
+					result = obj(*args, **kwargs)
+				except Exception as err:
+					print (name + ": " + type(err).__name__ + ": " + str(err), file=sys.stderr)
+
+		self.cache[name] = result
+		return result
+
+
+def castarg(obj, value):
+	""" items plugged into the value of another item are cast to its class, see Item.castarg """
+	if type(obj).__name__ == "ndarray":
+		return value
+	try:
+		return obj.__class__(value)
+	except Exception as err:
+		return value
+
+
+def run(file, output=None, save=None):
+	"""
+	evaluates the items named in `output` (a comma separated list) from the project `file`,
+	and either saves them to `save` or prints them.  Files ending in .npz are written with
+	numpy.savez, anything else is pickled as a dict
+	"""
+	if os.path.isdir(file):
+		# a project folder contains a .math file with the same name as the folder
+		file = os.path.join(file, os.path.basename(os.path.normpath(file)) + ".math")
+
+	if not os.path.isfile(file):
+		print ("mathinspector --run failed: " + file + " is not a file", file=sys.stderr)
+		return 1
+
+	graph = Graph(file)
+	names = output.split(",") if isinstance(output, str) else graph.outputs()
+	try:
+		results = { name: graph.value(name) for name in names }
+	except Exception as err:
+		print (err, file=sys.stderr)
+		return 1
+
+	if not save:
+		for name in results:
+			print (name + " = " + repr(results[name]))
+	elif os.path.splitext(save)[1] == ".npz":
+		import numpy as np
+		np.savez(save, **results)
+	else:
+		with open(save, "wb") as f:
+			pickle.dump(results, f)
+	return 0
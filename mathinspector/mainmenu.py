@@ -173,6 +173,20 @@ class MainMenu(Menu):
 		},{
 			"label": "Hide Console",
 			"command": lambda: self.setview("console")
+		},{
+			"label": "Show Node Profiler",
+			"command": self.toggle_profiler
+		}]
+
+		self.kernel = [{
+			"label": "Start Kernel",
+			"command": self.toggle_kernel
+		},{
+			"label": "Interrupt",
+			"command": lambda: app.console.kernel and app.console.kernel.interrupt()
+		},{
+			"label": "Restart",
+			"command": lambda: app.console.kernel and app.console.kernel.restart()
 		}]
 
 		self.help = [{
@@ -210,6 +224,9 @@ class MainMenu(Menu):
 		},{
 			"label": "View",
 			"menu": self.view
+		},{
+			"label": "Kernel",
+			"menu": self.kernel
 		},{
 			"label": "Help",
 			"menu": self.help
@@ -326,10 +343,23 @@ class MainMenu(Menu):
 			# else:
 			# 	self.app.vertical_panel.sashpos(0, 0)
 
+	def toggle_profiler(self):
+		is_visible = self.app.node.profile.show()
+		self._["View"].entryconfig("*Node Profiler", label="Hide Node Profiler" if is_visible else "Show Node Profiler")
+
+	def toggle_kernel(self):
+		if self.app.console.kernel:
+			self.app.console.stop_kernel()
+		else:
+			self.app.console.start_kernel()
+		self._["Kernel"].entryconfig(0, label="Stop Kernel" if self.app.console.kernel else "Start Kernel")
+
 	def restore_defaults(self):
 		self._["View"].entryconfig(0, label="Show Sidebar")
 		self._["View"].entryconfig(1, label="Show Node Editor")
-		self._["View"].entryconfig(2, label="Hide Console")	
+		self._["View"].entryconfig(2, label="Hide Console")
+		self.app.node.profile.show(False)
+		self._["View"].entryconfig("*Node Profiler", label="Show Node Profiler")
 
 	def import_module(self, module, alias="", open_folders=False):
 		self.app.modules[alias or module] = __import__(module)
@@ -76,7 +76,8 @@ class ModuleTree(vdict, Treeview):
 		vdict.__init__(self,
 			getitem=self.getmodule,
 			setitem=self.setmodule,
-			delitem=self.delete)
+			delitem=self.delete,
+			journal=True)
 
 		Treeview.__init__(self, app)
 
@@ -140,34 +141,11 @@ class ModuleTree(vdict, Treeview):
 				else:
 					constants.append(fn)
 
-		if builtin_fn:
-			folder = self.insert(parent, "end", text="builtins")
-			for i in builtin_fn:
-				self.insert(folder, "end",
-					text=i,
-					values=module.__name__ + "." + i)
-
-		if functions:
-			folder = self.insert(parent, "end", text="functions")
-			for i in functions:
-				self.insert(folder, "end",
-					text=i,
-					values=module.__name__ + "." + i)
-
-		if classes:
-			folder = self.insert(parent, "end", text="classes")
-			for j in classes:
-				self.insert(folder, "end",
-					text=j,
-					values=module.__name__ + "." + j)
-
-		if constants:
-			folder = self.insert(parent, "end", text="objects")
-			for k in constants:
-				if k[0] != "_":
-					self.insert(folder, "end",
-						text=k,
-						values=module.__name__ + "." + k)
+		for text, names in (("builtins", builtin_fn), ("functions", functions), ("classes", classes), ("objects", constants)):
+			if names:
+				rows = [{ "text": i, "values": module.__name__ + "." + i } for i in names]
+				folder = self.insert(parent, "end", text=text)
+				self.lazy(folder, lambda key, rows=rows: self.insert_rows(key, rows))
 
 		if submodules and file is None:
 			for fn, attr in submodules:
@@ -178,7 +156,7 @@ class ModuleTree(vdict, Treeview):
 						values=attr.__name__,
 						image=getimage(".py"))
 
-					self.setmodule(attr.__name__, attr, folder)
+					self.lazy(folder, lambda key, attr=attr: self.setmodule(attr.__name__, attr, key))
 		return False
 
 	def delete(self, key, del_objs=True):
@@ -187,11 +165,11 @@ class ModuleTree(vdict, Treeview):
 				self.delete(i)
 
 		if self.exists(key):
-			super(Treeview, self).delete(key)
+			Treeview.delete(self, key)
 		else:
 			name, ext = name_ext(key)
 			if self.exists(name):
-				super(Treeview, self).delete(name)
+				Treeview.delete(self, name)
 
 		if del_objs and key in self.locals:
 			for i in self.locals[key]:
@@ -0,0 +1,118 @@
+"""
+Compiles the items plugged into an item in the node editor into a single python function
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import re, keyword
+import numpy as np
+
+def compile_graph(canvas, name):
+	"""
+	generates the source code of a function which computes the value of the item `name`
+	by calling each of the functions plugged into it directly, in topological order.
+
+	Every input which isn't connected to another item becomes a parameter of the function.
+	Items with a value are named after the item, and the arguments of functions are named
+	item_argname.  Their current values are used as defaults, except for arguments which
+	are still empty, which become required parameters.  Unlike item.value(), exceptions
+	raised by any of the functions are not caught.
+	"""
+	order = upstream(canvas[name])
+	names, taken = {}, set()
+	required, optional, lines, env = [], [], [], {}
+
+	def parameter(key, default):
+		key = identifier(key, taken)
+		if default is None:
+			required.append(key)
+		else:
+			env["default_" + key] = default
+			optional.append(key + "=default_" + key)
+		return key
+
+	for i, item in enumerate(order):
+		var = "v" + str(i)
+		connected = { key: names[value.name] for attr in (item.args, item.kwargs) for key, value in attr["connection"].items() }
+
+		if not item.is_callable:
+			if "<value>" in connected:
+				env["cast" + str(i)] = castarg(item.obj)
+				lines.append(var + " = cast" + str(i) + "(" + connected["<value>"] + ")")
+			else:
+				lines.append(var + " = " + parameter(item.name, item.obj))
+		else:
+			args = []
+			for j in item.args.store:
+				args.append(connected[j] if j in connected else parameter(item.name + "_" + j, item.args.store[j]))
+			for k in item.kwargs.store:
+				if k in connected:
+					args.append(k + "=" + connected[k])
+				elif item.kwargs.store[k] is not None:
+					args.append(k + "=" + parameter(item.name + "_" + k, item.kwargs.store[k]))
+			env["fn" + str(i)] = item.obj
+			lines.append(var + " = fn" + str(i) + "(" + ", ".join(args) + ")")
+		names[item.name] = var
+
+	fname = identifier(name, set())
+	source = "def " + fname + "(" + ", ".join(required + optional) + "):\n\t" + "\n\t".join(lines + ["return " + names[name]]) + "\n"
+	exec(compile(source, "<node editor: " + name + ">", "exec"), env)
+	fn = env[fname]
+	fn.source = source
+	fn.__doc__ = "compiled from the node editor, see fn.source for the generated code"
+	return fn
+
+
+def upstream(item):
+	""" returns item and every item plugged into it, with each item after the items it depends on """
+	result, seen = [], set()
+	def visit(item):
+		if item.name in seen: return
+		seen.add(item.name)
+		for attr in (item.args, item.kwargs):
+			for value in attr["connection"].values():
+				visit(value)
+		result.append(item)
+	visit(item)
+	return result
+
+
+def castarg(obj):
+	""" the same cast as Item.castarg, for values plugged into the value of another item """
+	if isinstance(obj, np.ndarray):
+		return lambda value: value
+
+	def cast(value):
+		try:
+			return obj.__class__(value)
+		except Exception as err:
+			return value
+	return cast
+
+
+def identifier(name, taken):
+	"""
+	turns name into a valid python identifier which isn't a keyword and doesn't collide with
+	any of the names in `taken` or the variables in the generated code
+	"""
+	key = re.sub(r"\W", "_", name)
+	if not key or key[0].isdigit() or keyword.iskeyword(key) or re.match(r"^((v|fn|cast)\d+$|default_)", key):
+		key = "_" + key
+	result, i = key, 1
+	while result in taken:
+		result, i = key + "_" + str(i), i + 1
+	taken.add(result)
+	return result
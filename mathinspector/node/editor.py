@@ -25,12 +25,20 @@ from ..config import open_editor, BUTTON_RIGHT, BUTTON_RELEASE_RIGHT, BUTTON_RIG
 from ..style import Color, getimage
 from .output import Output
 from .item import Item
+from .scheduler import Scheduler
+from .profiler import Profiler
+from .spatial import SpatialIndex
+from . import compiler
+from .sweep import Sweep
 from ..widget import Popup, Menu, Text
 
 ZOOM_IN = 1.1
 ZOOM_OUT = 0.9
 HITBOX = 32 # used for detecting when to trigger wire connections in the node editor while dragging wires
 FONTSIZE = "12" # TODO - refactor how FONTSIZE and PROMPT_FONTSIZE works
+ZOOM_DELAY = 150 # milliseconds after the last mouse wheel event before fonts and line widths are rescaled
+DETAIL_ZOOM = 0.5 # below this zoom level the labels of each item are hidden
+CULL_MARGIN = 200 # items within this many pixels of the edge of the canvas are drawn
 
 class NodeEditor(vdict, tk.Canvas):
 	def __init__(self, app):
@@ -43,6 +51,16 @@ class NodeEditor(vdict, tk.Canvas):
 			background=Color.BACKGROUND,
 			bd=0)
 		self.zoom = 1
+		self.cache_stats = { "hits": 0, "misses": 0 } # graph-wide count of item.value() calls served from the cache
+		self.scheduler = Scheduler(self)
+		self.profile = Profiler(self)
+		self.index = SpatialIndex(self)
+		self.owners = {} # canvas id -> (item, role, argname), so event handlers don't have to parse tags
+		self.fonts = {} # canvas id -> (family, fontsize, stop_scaling, weight) read once when the id is first scaled
+		self.zoom_id = None
+		self.is_detailed = True
+		self.drawn = set() # items which currently have canvas objects, see NodeEditor.cull
+		self.cull_id = None
 		self.pan_position = None
 		self.dragitem = None
 		self.dragposition = (0,0)
@@ -107,11 +125,12 @@ class NodeEditor(vdict, tk.Canvas):
 		self.output.node.bind("<Button-1>", self._on_output_button_1)
 		self.output.node.bind("<B1-Motion>", self._on_output_b1_motion)
 		self.output.node.bind("<ButtonRelease-1>", self._on_output_button_release_1)
+		self.bind("<Configure>", lambda event: self.cull())
 
 	def setitem(self, name, update_value=False, coord=None, is_output_item=False):
 		if name not in self:
 			self[name] = Item(self, name, coord=coord or self.get_pointer(random=True))
-			self.scale_font()
+			self.cull_later()
 			if len(self.store) == 1:
 				self.app.menu.setview("node_editor", True)
 			return
@@ -135,8 +154,71 @@ class NodeEditor(vdict, tk.Canvas):
 			opts=item.opts,
 			is_output_item=is_output_item
 		)
+		self.cull_later()
 		self.scale_font()
 
+	def compile(self, name):
+		"""
+		returns a plain python function which computes the value of the item `name` by calling
+		everything plugged into it directly, without going through the items in the node editor.
+		The inputs which aren't connected to anything become the parameters of the function,
+		which makes it much faster to call in a loop than item.value()
+
+		>>> fn = app.node.compile("y")
+		>>> [fn(x=i) for i in range(100)]
+
+		The generated code can be viewed with the command
+
+		>>> print (fn.source)
+		"""
+		if name not in self:
+			print (Exception("NodeEditorError: there is no item named '" + str(name) + "' in the node editor"))
+			return None
+		return compiler.compile_graph(self, name)
+
+	def sweep(self, name, argname=None, values=None):
+		"""
+		evaluates the item `name` for every value in `values` of the argument `argname`, and
+		returns a Sweep with the stacked results, which can be stepped through in the plot
+		window without computing anything.  Functions which broadcast are called once with
+		every value, everything else is evaluated on the scheduler's worker threads
+
+		>>> sweep = app.node.sweep("power", "x2", linspace(1, 4, 300))
+		>>> sweep.play()
+
+		When argname or values are missing, a popup asks for a range of values instead
+		"""
+		if name not in self or not self[name].is_callable:
+			print (Exception("NodeEditorError: '" + str(name) + "' is not a function in the node editor"))
+			return None
+
+		item = self[name]
+		if argname is None or values is None:
+			Popup(self.app, [
+				{ "label": "argname", "value": argname or (list(item.args.keys()) or [""])[0] },
+				{ "label": "start", "value": 0 },
+				{ "label": "stop", "value": 1 },
+				{ "label": "num", "value": 100 }
+			],
+			lambda params: self._on_sweep(name, params),
+			"Sweep Item", name)
+			return None
+
+		if argname not in item.args and argname not in item.kwargs:
+			print (Exception("NodeEditorError: " + name + " has no argument named '" + str(argname) + "'"))
+			return None
+
+		if np.ndim(values) == 0 or len(values) == 0:
+			print (Exception("NodeEditorError: sweeping " + name + " needs at least one value of '" + str(argname) + "'"))
+			return None
+
+		return Sweep(item, argname, values, self.scheduler.executor)
+
+	def _on_sweep(self, name, params):
+		sweep = self.sweep(name, str(params["argname"]), np.linspace(params["start"], params["stop"], int(params["num"])))
+		if sweep is not None:
+			sweep.play()
+
 	def select(self, name):
 		if name is None:
 			self.selected = None
@@ -150,7 +232,8 @@ class NodeEditor(vdict, tk.Canvas):
 	def _on_item_enter(self, event, tag):
 		if self.is_busy(): return
 		closest = self.get_closest(event.x, event.y, tag) or self.find_closest(event.x, event.y)
-		item = self[self.getname(closest)]
+		item = self.owner(closest)[0]
+		if not item: return
 		self.hover = closest, item
 
 		if tag == "draggable":
@@ -171,7 +254,7 @@ class NodeEditor(vdict, tk.Canvas):
 		self.hover = None
 
 		if tag == "draggable":
-			item.config("parent", fill=Color.BLACK if self.getname(closest) != self.selected else Color.VERY_LIGHT_PURPLE)
+			item.config("parent", fill=Color.BLACK if item.name != self.selected else Color.VERY_LIGHT_PURPLE)
 		elif tag in ("output", "wire"):
 			if item.connection:
 				name, argname = item.connection
@@ -190,12 +273,14 @@ class NodeEditor(vdict, tk.Canvas):
 		x, y = self.get_pointer()
 		if event_delta > 0:
 			self.scale("all", x,y, ZOOM_IN, ZOOM_IN)
+			self.index.scale(x, y, ZOOM_IN)
 			self.zoom *= ZOOM_IN
 		else:
 			self.scale("all", x,y, ZOOM_OUT, ZOOM_OUT)
+			self.index.scale(x, y, ZOOM_OUT)
 			self.zoom *= ZOOM_OUT
-		self.scale_font()
-		self.scale_width()
+		self.level_of_detail()
+		self.cull()
 
 		if self.output.items:
 			for i in self.output.items:
@@ -204,15 +289,24 @@ class NodeEditor(vdict, tk.Canvas):
 		if self.edit_item:
 			self.edit_item.entry.zoom()
 
+		# fonts and line widths are only rescaled once the mouse wheel has stopped
+		if self.zoom_id:
+			self.after_cancel(self.zoom_id)
+		self.zoom_id = self.after(ZOOM_DELAY, self._on_zoom_stop)
+
+	def _on_zoom_stop(self):
+		self.zoom_id = None
+		self.scale_font()
+		self.scale_width()
+
 	def _on_motion_input(self, event):
-		closest = self.find_closest(event.x, event.y)[0]
-		if self.hover_input or "input" not in self.gettags(closest): return
+		if self.hover_input or not self.index.find(event.x, event.y, "input"): return
 		self._on_enter_input(event)
 
 	def _on_enter_input(self, event):
-		closest = self.find_closest(event.x, event.y)[0]
-		input_item = self[self.getname(closest)]
-		argname = self.getname(closest, "arg")
+		hit = self.index.find(event.x, event.y, "input")
+		if not hit: return
+		closest, (input_item, role, argname) = hit
 		if argname in input_item.args["connection"]:
 			item = input_item.args["connection"][argname]
 		elif argname in input_item.kwargs["connection"]:
@@ -237,24 +331,28 @@ class NodeEditor(vdict, tk.Canvas):
 
 		x, y = event.x - self.pan_position[0], event.y - self.pan_position[1]
 		self.move("all", x, y)
+		self.index.pan(x, y)
 		self.pan_position = (event.x, event.y)
+		self.cull()
 
 		if self.output.items:
 			for i in self.output.items:
 				i.move_wire()
 
 	def _on_item_button_1(self, event, tag):
-		closest = self.find_closest(event.x, event.y)[0]
-		item = self[self.getname(closest)]
-
 		if tag == "input":
-			argname = self.getname(closest, "arg")
+			hit = self.index.find(event.x, event.y, "input")
+			if not hit: return
+			closest, (item, role, argname) = hit
 			if argname in item.args["connection"]:
 				item = item.args["connection"][argname]
 			elif argname in item.kwargs["connection"]:
 				item = item.kwargs["connection"][argname]
 			else:
 				return
+		else:
+			item = self.owner(self.find_closest(event.x, event.y))[0]
+			if not item: return
 
 		if item.connection:
 			name, argname = item.connection
@@ -287,7 +385,7 @@ class NodeEditor(vdict, tk.Canvas):
 
 		item, output, argname, was_in_output = self.connect
 
-		input_id = self.get_closest(event.x, event.y, "input")
+		hit = self.index.nearest(event.x, event.y, HITBOX * self.zoom, "input")
 		in_output = self.winfo_containing(event.x_root, event.y_root) in (self.frame, self.output.node)
 		in_items = (self.winfo_containing(event.x_root, event.y_root) == self)
 
@@ -298,11 +396,10 @@ class NodeEditor(vdict, tk.Canvas):
 		elif item in self.output.items and in_items:
 			self.output.disconnect(item)
 
-		if input_id:
-			x1,y1,x2,y2 = self.coords(input_id[0])
+		if hit:
+			input_id, (output, role, argname) = hit
+			x1,y1,x2,y2 = self.index.bbox(input_id)
 			item.move_wire((x1 + x2)/2, (y1 + y2)/2)
-			output = self[self.getname(input_id)]
-			argname = self.getname(input_id, "arg")
 			output.config("arg="+argname, fill=Color.HOVER)
 			self.connect = item, output, argname, in_output
 			return
@@ -374,15 +471,16 @@ class NodeEditor(vdict, tk.Canvas):
 
 
 	def _on_motion_editable(self, event):
-		closest = self.get_closest(event.x, event.y, "editable")
-		if self.hover_edit or "editable" not in self.gettags(closest): return
-		self._on_enter_editable(event)
+		if self.hover_edit: return
+		closest = self.editable_at(event.x, event.y)
+		if closest is None: return
+		self._on_enter_editable(event, closest)
 
 	def _on_enter_editable(self, event, closest=None):
-		closest = closest or self.find_closest(event.x, event.y)[0]
-		if "editable" not in self.gettags(closest): return
+		closest = closest or self.editable_at(event.x, event.y)
+		if not self.is_editable(closest): return
 
-		item = self[self.getname(closest)]
+		item = self.owner(closest)[0]
 		color = self.itemconfig(closest)["fill"][4]
 		self.itemconfig(closest, fill=Color.WHITE)
 		self.hover_edit = closest, item, color
@@ -407,15 +505,14 @@ class NodeEditor(vdict, tk.Canvas):
 			self.tag_raise(i)
 
 		self.dragstart = (event.x, event.y)
-		if "editable" in self.gettags(self.dragitem):
-			self._on_enter_editable(event, self.dragstart)
+		if self.is_editable(self.dragitem):
+			self._on_enter_editable(event, self.dragitem)
 
 	def _on_drag(self, event):
-		name = self.getname(self.dragitem)
-		if name not in self: return
+		item = self.owner(self.dragitem)[0]
+		if not item or item.name not in self: return
 
-		item = self[name]
-		if "editable" in self.gettags(self.dragitem):
+		if self.is_editable(self.dragitem):
 			delta_x = event.x - self.dragposition[0]
 			delta_y = event.y - self.dragposition[1]
 			self.dragposition = (event.x, event.y)
@@ -453,6 +550,7 @@ class NodeEditor(vdict, tk.Canvas):
 			self.select(self.getname(self.dragitem))
 		self.dragitem = None
 		self.dragposition = (0,0)
+		self.cull_later()
 
 	def _on_button_1(self, event):
 		self.menu.unpost() # fix for menu not closing properly on linux
@@ -462,7 +560,7 @@ class NodeEditor(vdict, tk.Canvas):
 
 		if self.dragitem or self.connect: return
 		if self.hover_edit:
-			self[self.getname(self.hover_edit)].entry.finish()
+			self.hover_edit[1].entry.finish()
 			self.hover_edit = None
 			return
 		for name in self.multiselect["items"]:
@@ -493,7 +591,7 @@ class NodeEditor(vdict, tk.Canvas):
 	# REFACTOR: move the bulk of this into its own class with a __call__ attr so its super simple to call in here
 	def _on_item_menu(self, event):
 		self.has_menu = True
-		item = self[self.getname(self.find_closest(event.x, event.y))]
+		item = self.owner(self.find_closest(event.x, event.y))[0]
 		if self.multiselect["items"]:
 			self.menu.show(event, [{
 				"label": "Delete selected items...",
@@ -503,7 +601,7 @@ class NodeEditor(vdict, tk.Canvas):
 
 		graph, extras, methods = [], [], []
 		obj = self.app.objects[item.name]
-		value = item.value()
+		value = item.peek()
 		item_methods = [i for i in dir(obj) if i[:1] != "_" and callable(getattr(obj, i)) and isinstance(i, str)]
 		if item_methods:
 			methods.append({ "separator": None })
@@ -539,6 +637,12 @@ class NodeEditor(vdict, tk.Canvas):
 				"command": lambda: self.app.animate(item.name)
 			})
 
+		if item.is_callable and (len(item.args) or len(item.kwargs)):
+			extras.append({
+				"label": "sweep",
+				"command": lambda: self.sweep(item.name)
+			})
+
 		extras.append({
 			"separator": None
 		})
@@ -649,42 +753,115 @@ class NodeEditor(vdict, tk.Canvas):
 			y = self.canvasy(self.winfo_pointery() - self.winfo_rooty())
 		return x,y
 
-	def scale_font(self):
+	def cull(self):
+		"""
+		draws every item which is within CULL_MARGIN of the visible part of the node editor, along
+		with the items connected to them, and erases the canvas objects of all the other items.
+		The cost of panning and zooming only depends on the number of items which are drawn.
+		"""
+		self.cull_id = None
+		if not self.winfo_ismapped(): return
+
+		x1, y1 = -CULL_MARGIN, -CULL_MARGIN
+		x2, y2 = self.winfo_width() + CULL_MARGIN, self.winfo_height() + CULL_MARGIN
+		visible = set(self.output.items)
+		for key in self.index.query(x1, y1, x2, y2):
+			item, role, argname = self.index.entries[key][1]
+			if role != "parent": continue
+			bx1, by1, bx2, by2 = self.index.bbox(key)
+			if bx1 <= x2 and bx2 >= x1 and by1 <= y2 and by2 >= y1:
+				visible.add(item)
+
+		for item in list(visible):
+			visible.update(self.scheduler.upstream(item))
+			if self.scheduler.downstream(item):
+				visible.add(self.scheduler.downstream(item))
+
+		in_use = (self.edit_item, self.owner(self.dragitem)[0], self.connect and self.connect[0])
+		for item in self.drawn - visible:
+			if item not in in_use:
+				item.erase()
+		for item in visible - self.drawn:
+			item.draw()
+
+	def cull_later(self):
+		if self.cull_id is None:
+			self.cull_id = self.after_idle(self.cull)
+
+	def scale_font(self, *items):
 		font_items = []
-		for i in self:
-			font_items.extend([self[i].ids["name"], self[i].ids["class"]])
-			if "value" in self[i].ids:
-				 font_items.append(self[i].ids["value"])
-			for j in self[i].ids:
+		for item in items or self.drawn:
+			font_items.extend([item.ids["name"], item.ids["class"]])
+			if "value" in item.ids:
+				 font_items.append(item.ids["value"])
+			for j in item.ids:
 				if j[:7] == "argname" or j[:9] == "kwargname" or j[:8] == "argvalue" or j[:10] == "kwargvalue":
-					font_items.append(self[i].ids[j])
+					font_items.append(item.ids[j])
 
 		for i in font_items:
-			font = self.itemconfig(i)["font"][3].split(" ")
-			tags = self.gettags(i)
+			family, size, stop_scaling, weight = self.font(i)
 			fontsize = FONTSIZE
-			for t in tags:
-				if t[:9] == "fontsize=":
-					if "stop_scaling" in tags and self.zoom < 1:
-						fontsize = t[9:]
-					else:
-						fontsize = str(int(int(t[9:]) * self.zoom) or 1)
-			self.itemconfig(i, font=font[0] + " " + fontsize + ("" if len(font) < 3 else " " + font[2]))
-
-	def scale_width(self):
-		width_items = [self[i].ids["wire"] for i in self]
+			if size:
+				if stop_scaling and self.zoom < 1:
+					fontsize = size
+				else:
+					fontsize = str(int(int(size) * self.zoom) or 1)
+			self.itemconfig(i, font=family + " " + fontsize + weight)
+
+	def font(self, canvas_id):
+		if canvas_id not in self.fonts:
+			font = self.itemconfig(canvas_id)["font"][3].split(" ")
+			tags = self.gettags(canvas_id)
+			size = [t[9:] for t in tags if t[:9] == "fontsize="]
+			self.fonts[canvas_id] = font[0], size[-1] if size else None, "stop_scaling" in tags, "" if len(font) < 3 else " " + font[2]
+		return self.fonts[canvas_id]
+
+	def show_detail(self):
+		return self.zoom >= DETAIL_ZOOM
+
+	def level_of_detail(self):
+		"""
+		hides the argument names, argument values and class names of every item when the node
+		editor is zoomed out past DETAIL_ZOOM, and shows them again when zooming back in
+		"""
+		if self.show_detail() == self.is_detailed: return
+		self.is_detailed = self.show_detail()
+		for item in self.drawn:
+			item.detail(self.is_detailed)
+
+	def scale_width(self, *items):
+		width_items = [item.ids["wire"] for item in items or self.drawn]
 		for i in width_items:
 			self.itemconfig(i, width=1 + int(self.zoom))
 
 	def find_siblings(self, item):
-		name = self.getname(item)
-		return self.find_withtag("name=" + name) if name else [item]
+		owner, role, argname = self.owner(item)
+		return owner.children() if owner else [item]
+
+	def owner(self, canvas_id):
+		"""
+		returns (item, role, argname) for a canvas id belonging to an item in the node editor,
+		or (None, None, None) for anything else on the canvas
+		"""
+		if isinstance(canvas_id, (tuple, list)):
+			canvas_id = canvas_id[0] if canvas_id else None
+		return self.owners.get(canvas_id, (None, None, None))
 
 	def getname(self, item, key="name"):
-		for t in self.gettags(item):
-			if t[:len(key) + 1] == key + "=":
-				return t[len(key) + 1:]
-		return None
+		owner, role, argname = self.owner(item)
+		if key == "name":
+			return owner.name if owner else None
+		if key == "arg":
+			return argname if role == "input" else None
+		return argname if role == key else None
+
+	def editable_at(self, x, y):
+		""" the canvas id of the value or argument value under the point (x,y), from the spatial index """
+		hit = self.index.find(x, y, "argvalue")
+		return hit[0] if hit else None
+
+	def is_editable(self, canvas_id):
+		return self.owner(canvas_id)[1] == "argvalue"
 
 	def find_withtag(self, *args):
 		if len(args) <= 1:
@@ -692,7 +869,8 @@ class NodeEditor(vdict, tk.Canvas):
 
 		result = self.find_withtag(args[0])
 		for i in range(1, len(args)):
-			result = [j for j in self.find_withtag(args[i]) if j in result]
+			tagged = set(self.find_withtag(args[i]))
+			result = [j for j in result if j in tagged]
 
 		if len(result) == 1:
 			return result[0]
@@ -700,6 +878,15 @@ class NodeEditor(vdict, tk.Canvas):
 		return result
 
 	def get_closest(self, x,y, tag=None):
+		if tag in ("input", "output"):
+			hit = self.index.nearest(x, y, HITBOX * self.zoom, tag)
+			return (hit[0],) if hit else ()
+
+		if tag == "draggable":
+			hit = self.index.find(x, y, "parent")
+			if hit and hit[1][0].ids:
+				return (hit[1][0].ids["parent"],)
+
 		overlapping = self.find_overlapping(
 			x - HITBOX * self.zoom, y - HITBOX * self.zoom,
 			x + HITBOX * self.zoom, y + HITBOX * self.zoom
@@ -708,4 +895,6 @@ class NodeEditor(vdict, tk.Canvas):
 		if tag == None:
 			return overlapping
 
-		return tuple([i for i in self.find_closest(x,y) if i in self.find_withtag(tag)])
+		closest = self.find_closest(x,y)
+		tagged = set(super(NodeEditor, self).find_withtag(tag))
+		return tuple([i for i in closest if i in tagged])
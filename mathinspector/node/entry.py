@@ -22,6 +22,7 @@ from pprint import pformat
 from ..util import fontcolor
 from ..style import Color
 from ..widget.text import Text
+from .preview import is_summarized, fulltext
 
 class Entry(Text):
 	def __init__(self, item):
@@ -36,6 +37,7 @@ class Entry(Text):
 		self.canvas = item.canvas
 		self.app = item.canvas.app
 		self.argname = None
+		self.original = None
 		self.window = None
 		self.edit_id = None
 		self.font = None
@@ -50,7 +52,13 @@ class Entry(Text):
 		self.delete("1.0", "end")
 		# REFACTOR - way too busy with these nested if's
 		arg = None if self.argname == "<value>" else self.item.args[self.argname] if self.argname in self.item.args else self.item.kwargs[self.argname]
-		self.insert("end", self.item.content(truncate=False) if self.argname == "<value>" else "" if arg is None else self.item.content(arg, truncate=False))
+		value = self.item.obj if self.argname == "<value>" else arg
+		if is_summarized(value):
+			# the preview of a large value is only part of it, so the whole value is edited
+			self.insert("end", fulltext(value))
+		else:
+			self.insert("end", self.item.content(truncate=False) if self.argname == "<value>" else "" if arg is None else self.item.content(arg, truncate=False))
+		self.original = self.get("1.0", "end-1c")
 
 		font = self.canvas.itemconfig(canvas_id)["font"][4]
 		params = font.split(" ")
@@ -102,6 +110,11 @@ class Entry(Text):
 			return
 
 		content = self.get("1.0", "end-1c")
+		if content == self.original:
+			# large values are only shown as a preview, so an unchanged value is never evaluated
+			self.finish(cancel=True)
+			return
+
 		if content == "":
 			content = "None"
 
@@ -26,6 +26,8 @@ from ..util import vdict
 from ..util import classname, fontcolor, argspec
 from ..config import ITEM_FONTSIZE as FONTSIZE
 from .entry import Entry
+from .preview import preview, summary
+from ..console.kernel import Proxy
 from textwrap import fill
 from pprint import pformat
 from numpy import ufunc
@@ -35,6 +37,7 @@ MAX_NUMBER_WIDTH = 10
 MAX_STR_WIDTH = 256
 TEXTWRAP_SIZE = 28
 NODE_SIZE = 6
+PENDING = "..." # shown in place of the value of a function until the scheduler has computed it
 
 class Item:
     def __init__(self, canvas, name, coord=(0,0), args={}, kwargs={}, connection=None, opts={}, class_name=None, is_output_item=False):
@@ -59,16 +62,55 @@ class Item:
             "line_color": opts["line_color"]  if "line_color" in opts else  Color.BLUE
         }, setitem=self.option)
 
-        self.entry = Entry(self)
+        self._entry = None
         self.is_callable = callable(self.obj)
         self.classname = class_name or classname(self.obj)
         self.show_wire = False
         self.method = None
         self.cached_value = None
         self.should_cache_value = True
+        self.is_dirty = True
+        self.version = 0
 
         self.ids = {}
+        self.labels = {}
+        self.previews = { "version": None }
+        self.shown = PENDING
         x, y = coord
+        self.center = self.canvas.index.to_world(x, y, x, y)[:2]
+
+        if not self.is_callable:
+            self.args.store["<value>"] = args["<value>"] if "<value>" in args else self.obj
+        else:
+            for j in self.argspec[0]:
+                if j not in self.args:
+                    self.args.store[j] = args[j] if j in args else None
+            for k in self.argspec[1]:
+                if k not in self.kwargs:
+                    self.kwargs.store[k] = kwargs[k] if k in kwargs else self.argspec[1][k]
+
+        self.resize()
+        if connection:
+            output_name, output_arg = connection
+            output = self.canvas[output_name]
+            if output_arg in output.args:
+                output.args[output_arg] = self
+            else:
+                output.kwargs[output_arg] = self
+            self.move_wire()
+
+        if is_output_item:
+            self.app.node.output.connect(self)
+
+    def draw(self):
+        """
+        creates the canvas objects for the item.  To keep the node editor fast with very large
+        graphs, these only exist while the item is close to the visible part of the canvas
+        """
+        if self.ids: return
+
+        canvas = self.canvas
+        x, y = self.position()
         width, height = self.dimensions(self.obj)
         node = NODE_SIZE * self.canvas.zoom
         create_parent = getattr(self.canvas, "create_" + ("rectangle" if callable(self.obj) or isinstance(self.obj, (str, list, dict)) else "oval"))
@@ -80,7 +122,7 @@ class Item:
 
         self.ids["name"] = canvas.create_text(0,0,
             tags=("name", "draggable", "name=" + self.name, "font", "fontsize="+FONTSIZE["name"], "stop_scaling"),
-            text=name or '',
+            text=self.name or '',
             fill=Color.WHITE,
             font="Menlo 18")
 
@@ -109,7 +151,6 @@ class Item:
                 fill=fontcolor(self.obj),
                 font="Menlo 16")
 
-            self.args.store["<value>"] = args["<value>"] if "<value>" in args else self.obj
             self.ids["arg=<value>"] = canvas.create_oval(0,0,0,0,
                 tags=("input", "arg=<value>", "name=" + self.name),
                 outline=Color.INACTIVE,
@@ -119,8 +160,6 @@ class Item:
             offset = ((2 * num_args) or 1 - height/2) * self.canvas.zoom
             i = 0 if num_args == 1 else (1 - num_args + 0.2)
             for j in self.argspec[0]:
-                if j not in self.args:
-                    self.args.store[j] = args[j] if j in args else None
                 self.ids["arg=" + j] = canvas.create_oval(0,0,0,0,
                     tags=("input", "arg=" + j, "name=" + self.name),
                     outline=Color.INACTIVE,
@@ -134,14 +173,12 @@ class Item:
 
                 self.ids["argvalue=" + j] = canvas.create_text(0,0,
                     tags=("argvalue=" + j, "draggable", "editable", "name=" + self.name, "font", "fontsize="+FONTSIZE["argvalue"]),
-                    text="None",
-                    fill=Color.RED,
+                    text=self.labels[j][0] if j in self.labels else "None",
+                    fill=self.labels[j][1] if j in self.labels else Color.RED,
                     anchor="w")
                 i += 2
 
             for k in self.argspec[1]:
-                if k not in self.kwargs:
-                    self.kwargs.store[k] = kwargs[k] if k in kwargs else self.argspec[1][k]
                 self.ids["arg=" + k] = canvas.create_oval(0,0,0,0,
                     tags=("arg=" + k, "input", "name=" + self.name),
                     state="normal" if self.opts["show_kwargs"] else "hidden",
@@ -156,25 +193,49 @@ class Item:
                     anchor="w")
 
                 self.ids["argvalue=" + k] = canvas.create_text(0,0,
-                    text=str(self.kwargs[k]),
+                    text=self.labels[k][0] if k in self.labels else preview(self.kwargs.store[k]),
                     tags=("argvalue=" + k, "draggable", "editable", "name=" + self.name, "font", "fontsize="+FONTSIZE["argvalue"]),
                     state="normal" if self.opts["show_kwargs"] else "hidden",
-                    fill=fontcolor(self.kwargs[k]),
+                    fill=self.labels[k][1] if k in self.labels else fontcolor(self.kwargs.store[k]),
                     anchor="w")
                 i += 2
 
+        for key in self.ids:
+            self.canvas.owners[self.ids[key]] = (self,) + self.role(key)
+
+        if not self.canvas.show_detail():
+            self.detail(False)
+
+
+        if self.canvas.selected == self.name:
+            self.config("parent", fill=Color.VERY_LIGHT_PURPLE)
+        for attr in (self.args, self.kwargs):
+            for key in attr["connection"]:
+                self.config("arg="+key, fill=Color.PURPLE)
+        self.busy(self in self.canvas.scheduler.running)
+        if self.canvas.profile.is_visible:
+            self.canvas.profile.tint(self)
+
+        self.canvas.drawn.add(self)
+        self.canvas.scale_font(self)
+        self.canvas.scale_width(self)
         self.resize()
-        if connection:
-            output_name, output_arg = connection
-            output = self.canvas[output_name]
-            if output_arg in output.args:
-                output.args[output_arg] = self
-            else:
-                output.kwargs[output_arg] = self
-            self.move_wire()
+        for item in self.canvas.scheduler.upstream(self):
+            item.move_wire()
 
-        if is_output_item:
-            self.app.node.output.connect(self)
+    def erase(self):
+        """
+        deletes the canvas objects of the item when it leaves the visible part of the node editor,
+        the item itself and its bounding box in the spatial index are kept
+        """
+        for i in self.children():
+            self.canvas.index.remove(i)
+            self.canvas.owners.pop(i, None)
+            self.canvas.fonts.pop(i, None)
+            self.canvas.delete(i)
+        self.ids = {}
+        self.show_wire = False
+        self.canvas.drawn.discard(self)
 
     # REFACTOR - not crazy about this function having two purposes, should use .setvalue instead
     # TODO - indicate the error more clearly when the item.hasargs() is true but it raises an exception
@@ -198,68 +259,100 @@ class Item:
         system for optimizing the layout of items in the node editor when plotting things.
         """
         if obj is None:
-            if self.is_callable and self.hasargs():
-
-                try:
-                    result = self.obj(*[self.args[i] for i in self.args], **{ k: self.kwargs[k] for k in self.kwargs if self.kwargs.store[k] is not None })
-                except Exception as err:
-                    return self.obj
-
-                # TODO - use a better system for detecting functions that are trying to be plotted
-                if (self in self.canvas.output.items
-                    and not isinstance(result, (int,float,complex))
-                    and isinstance(result[0], (int,float))
-                    and len(self.args) > 0
-                ):
-                    try:
-                        arg = self.args[list(self.args.keys())[0]]
-                        result = np.array([(arg[i],result[i]) for i in range(0,len(result))])
-                    except Exception as err:
-                        # print ("error", err)
-                        pass
-
-                return result
-            return self.obj
+            if not self.is_callable:
+                # variables which live in the kernel are copied into the app when they're used
+                return self.obj.value() if isinstance(self.obj, Proxy) else self.obj
+
+            if not self.is_dirty and self.should_cache_value:
+                self.canvas.cache_stats["hits"] += 1
+                return self.cached_value
+
+            # items can be evaluated from the scheduler's worker threads, so the result is only
+            # cached if the item was not invalidated again while it was being computed
+            self.canvas.cache_stats["misses"] += 1
+            version = self.version
+            result = None
+            self.canvas.profile.start()
+            try:
+                result = self.compute()
+            finally:
+                self.canvas.profile.record(self, result)
+            if version == self.version:
+                self.cached_value = result
+                self.is_dirty = False
+            return result
 
         # if "<value>" in self.args["connection"]:
         #     self.args["connection"]["<value>"].disconnect()
 
         self.obj = obj
+        self.invalidate()
         if not self.is_callable:
             self.config("value", text=self.content())
 
-        if self.connection:
-            name, argname = self.connection
-            if argname in self.canvas[name].args:
-                self.canvas[name].args[argname] = self
-            elif argname in self.canvas[name].kwargs:
-                self.canvas[name].kwargs[argname] = self
-
-        if self in self.canvas.output.items:
-            self.canvas.output.update_value(self)
-
+        self.canvas.scheduler(self)
         self.move_wire()
         self.resize()
 
+    def compute(self):
+        """
+        evaluates the underlying function with the values currently plugged into the item,
+        without going through the cache.  Use item.value() instead unless you specifically
+        need to bypass the cached result.
+        """
+        if not self.hasargs():
+            return self.obj
+
+        try:
+            result = self.obj(*[self.args[i] for i in self.args], **{ k: self.kwargs[k] for k in self.kwargs if self.kwargs.store[k] is not None })
+        except Exception as err:
+            return self.obj
+
+        # TODO - use a better system for detecting functions that are trying to be plotted
+        if (self in self.canvas.output.items
+            and not isinstance(result, (int,float,complex))
+            and isinstance(result[0], (int,float))
+            and len(self.args) > 0
+        ):
+            try:
+                arg = self.args[list(self.args.keys())[0]]
+                result = np.array([(arg[i],result[i]) for i in range(0,len(result))])
+            except Exception as err:
+                # print ("error", err)
+                pass
+
+        return result
+
+    def invalidate(self):
+        """
+        marks this item, and every item downstream of it, as needing to be recomputed the
+        next time item.value() is called.  Each item has at most one outgoing connection,
+        so this only walks a single chain of items and never evaluates anything.
+        """
+        item, seen = self, set()
+        while item and item.name not in seen:
+            seen.add(item.name)
+            item.is_dirty = True
+            item.cached_value = None
+            item.version += 1
+            item = item.canvas[item.connection[0]] if item.connection and item.connection[0] in item.canvas else None
+
     def getarg(self, key, attr):
         params = getattr(self, attr).store
         if key == "connection":
             return { i: params[i] for i in params if isinstance(params[i], Item) }
-        return params[key].value() if isinstance(params[key], Item) else params[key]
+        return params[key].value() if isinstance(params[key], (Item, Proxy)) else params[key]
 
     def setarg(self, key, value):
+        self.invalidate()
         prev = self.args.store[key] if key in self.args["connection"] else self.kwargs.store[key] if key in self.kwargs["connection"] else None
         result = value
         if isinstance(value, Item):
-            if value == self: return False
+            if self.canvas.scheduler.creates_cycle(value, self):
+                print (Exception("NodeEditorError: connecting " + value.name + " to " + self.name + " would create a cycle"))
+                return False
 
-            if key == "<value>" and not isinstance(self.obj, np.ndarray):
-                try:
-                    result = self.obj.__class__(value.value())
-                except Exception as err:
-                    result = value.value()
-            else:
-                result = value.value()
+            result = self.castarg(key, value)
             value.connection  = self.name, key
             self.config("arg="+key, fill=Color.PURPLE)
             value.config("output", fill=Color.PURPLE)
@@ -278,38 +371,82 @@ class Item:
         if prev:
             if value is None:
                 if key in self.args:
-                    self.args.store[key] = self.args.store[key].value()
+                    self.args.store[key] = self.args.store[key].peek()
                 elif key in self.kwargs:
-                    self.kwargs.store[key] = self.kwargs.store[key].value()
+                    self.kwargs.store[key] = self.kwargs.store[key].peek()
                 prev.disconnect()
                 return False
             elif prev != value:
                 prev.disconnect()
 
+        if isinstance(value, Item) and not value.is_ready():
+            # the argument is shown once the scheduler has computed the item plugged into it
+            self.canvas.scheduler(value)
+        else:
+            self.showarg(key, result)
+
+        # the store is written here instead of by the vdict so the item is never scheduled
+        # while still holding its previous value
+        if key in self.args:
+            self.args.store[key] = value
+        elif key in self.kwargs:
+            self.kwargs.store[key] = value
+        else:
+            return
+        self.invalidate()
+        self.canvas.scheduler(self)
+        return False
+
+    def castarg(self, key, item):
+        """
+        the value of `item` as seen by the argument `key`, items plugged into the value of another
+        item are cast to the class of that item whenever possible.  Only the cached value of item is
+        used, this returns None while item is waiting to be computed
+        """
+        if not item.is_ready():
+            return None
+        if key == "<value>" and not isinstance(self.obj, np.ndarray):
+            try:
+                return self.obj.__class__(item.value())
+            except Exception as err:
+                pass
+        return item.value()
+
+    def showarg(self, key, result):
+        text = preview(result)
         if key == "<value>":
             self.app.objects[self.name] = result
         else:
-            self.config("argvalue="+key, text=str(result)[:MAX_NUMBER_WIDTH], fill=fontcolor(result))
+            self.labels[key] = text[:MAX_NUMBER_WIDTH], fontcolor(result)
+            self.config("argvalue="+key, text=self.labels[key][0], fill=fontcolor(result))
 
-        self.app.objects.item(self.name + "<arg=" + key + ">",
-            text=str(result),
-            tags=("editable", fontcolor(result, as_string=True)))
+        self.app.objects.setrow(self.name, self.name + "<arg=" + key + ">", text, ("editable", fontcolor(result, as_string=True)))
 
-        if self.connection:
-            name, argname = self.connection
-            item = self.canvas[name]
-            if argname in item.args:
-                item.args[argname] = self
-            elif argname in item.kwargs:
-                item.kwargs[argname] = self
+    def refresh(self):
+        """
+        updates the displayed value of every connected argument, called by the scheduler
+        after the items plugged into this item have been recomputed
+        """
+        for attr in (self.args, self.kwargs):
+            connection = attr["connection"]
+            for key in connection:
+                if connection[key].is_ready():
+                    self.showarg(key, self.castarg(key, connection[key]))
 
-        if self in self.canvas.output.items:
-            if key in self.args:
-                self.args.store[key] = value
-            elif key in self.kwargs:
-                self.kwargs.store[key] = value
-            self.canvas.output.update_value(self)
-            return False
+    def is_ready(self):
+        """ returns True when value() can return without computing anything """
+        return not self.is_callable or not self.is_dirty
+
+    def peek(self):
+        """
+        the value of the item when it doesn't have to be computed, otherwise the item is scheduled
+        and None is returned.  Used instead of value() by the event handlers on the tk thread
+        """
+        if self.is_ready():
+            return self.value()
+        if self not in self.canvas.scheduler.running:
+            self.canvas.scheduler(self)
+        return None
 
 
     def disconnect(self):
@@ -332,20 +469,43 @@ class Item:
             color = str(value) or Color.BLUE
         elif key == "show_kwargs":
             for j in self.kwargs:
-                for k in ("arg="+j, "argname="+j, "argvalue="+j):
-                    self.config(k, state="normal" if self.opts["show_kwargs"] else "hidden")
+                self.config("arg="+j, state="normal" if self.opts["show_kwargs"] else "hidden")
+            self.detail(self.canvas.show_detail())
             self.resize()
             self.move()
         return False
 
     def content(self, *args, truncate=True):
+        """
+        the text displayed for obj (defaults to self.obj), which is only formatted from a bounded
+        preview of obj and cached until the item is invalidated
+        """
         obj = self.obj if not args else args[0]
-        if callable(obj): return str(self.value())
+        if self.is_callable and obj is self.obj:
+            # the value of a function is only computed by the scheduler, never while drawing,
+            # so until the result comes in the previous value is shown
+            if self.is_dirty:
+                if self not in self.canvas.scheduler.running:
+                    self.canvas.scheduler(self)
+                return self.shown
+            obj, truncate = self.cached_value, False
+        elif obj is not self.obj:
+            return self.format(obj, truncate)
+
+        if self.previews["version"] != self.version:
+            self.previews = { "version": self.version }
+
+        if truncate not in self.previews:
+            self.previews[truncate] = self.format(obj, truncate)
+        if self.is_callable:
+            self.shown = self.previews[truncate]
+        return self.previews[truncate]
 
+    def format(self, obj, truncate=True):
         if isinstance(obj, dict):
-            return pformat(obj, indent=4, width=MAX_NUMBER_WIDTH)
+            return pformat(summary(obj), indent=4, width=MAX_NUMBER_WIDTH)
 
-        result = fill(str(obj), width=TEXTWRAP_SIZE) if isinstance(obj, (str, list)) else str(obj)
+        result = fill(preview(obj), width=TEXTWRAP_SIZE) if isinstance(obj, (str, list)) else preview(obj)
         if not truncate:
             return result
 
@@ -354,15 +514,22 @@ class Item:
 
     def resize(self, content=None):
         content = content if content is not None else self.content()
-        try:
-            x, y = self.position()
-        except:
-            return
+        x, y = self.position()
         width, height = self.dimensions(content)
         node = NODE_SIZE * self.canvas.zoom
 
-        self.coords("parent", x - width/2, y - height/2, x + width/2, y + height/2)
-        self.coords("output", x + width/2 - node, y - node, x + width/2 + node, y + node)
+        index = self.canvas.index
+        index.remove_item(self)
+        parent = x - width/2, y - height/2, x + width/2, y + height/2
+        index.insert(self, parent, self, "parent")
+        if not self.ids: return
+
+        output = x + width/2 - node, y - node, x + width/2 + node, y + node
+        self.coords("parent", *parent)
+        self.coords("output", *output)
+        index.insert(self.ids["output"], output, self, "output")
+        if "value" in self.ids:
+            index.insert(self.ids["value"], parent, self, "argvalue", "<value>")
         self.coords("name", x, y - height/2 - 20 * self.canvas.zoom)
         # self.canvas.scale_font()
         self.coords("class", x, y + height/2 + 20 * self.canvas.zoom)
@@ -373,23 +540,41 @@ class Item:
         offset = 2 * num_args
         i = 0 if num_args == 1 else (1 - num_args + 0.2)
         for j in self.args.store:
-            self.coords("arg="+j, x - width/2 - node, y - node + i*height/offset, x - width/2 + node, y + node + i*height/offset)
+            bbox = x - width/2 - node, y - node + i*height/offset, x - width/2 + node, y + node + i*height/offset
+            self.coords("arg="+j, *bbox)
+            index.insert(self.ids["arg="+j], bbox, self, "input", j)
             self.coords("argname="+j, x - width/2 + 12*self.canvas.zoom, y + i*height/offset - 12*self.canvas.zoom)
             self.coords("argvalue="+j, x - width/2 + 12*self.canvas.zoom, y + i*height/offset)
+            self.index_label(j, x - width/2 + 12*self.canvas.zoom, x + width/2, y + i*height/offset)
             i += 2
 
         if not self.opts["show_kwargs"]: return
         for k in self.kwargs.store:
-            self.coords("arg="+k, x - width/2 - node, y - node + i*height/offset, x - width/2 + node, y + node + i*height/offset)
+            bbox = x - width/2 - node, y - node + i*height/offset, x - width/2 + node, y + node + i*height/offset
+            self.coords("arg="+k, *bbox)
+            index.insert(self.ids["arg="+k], bbox, self, "input", k)
             self.coords("argname="+k, x - width/2 + 12*self.canvas.zoom, y + i*height/offset - 12*self.canvas.zoom)
             self.coords("argvalue="+k, x - width/2 + 12*self.canvas.zoom, y + i*height/offset)
+            self.index_label(k, x - width/2 + 12*self.canvas.zoom, x + width/2, y + i*height/offset)
             i += 2
 
+    def index_label(self, argname, left, right, y):
+        """
+        adds the value of an argument to the spatial index, so hovering over it doesn't have to ask tk
+        which text is under the cursor.  The labels are anchored on the left, and never wider than the item
+        """
+        key = "argvalue=" + argname
+        if key not in self.ids: return
+        self.canvas.index.insert(self.ids[key], (left, y - 10 * self.canvas.zoom, right, y + 10 * self.canvas.zoom), self, "argvalue", argname)
+
 
     def move(self, x=0, y=0, wires_only=False):
         if not wires_only:
+            cx, cy = self.center
+            self.center = cx + x/self.canvas.zoom, cy + y/self.canvas.zoom
             for i in self.children():
                 self.canvas.move(i, x, y)
+            self.canvas.index.move_item(self, x, y)
 
         if self.connection or self in self.canvas.output.items:
             self.move_wire()
@@ -402,11 +587,16 @@ class Item:
 
 
     def move_wire(self, *coord):
+        if not self.ids: return
         if not coord:
             if self in self.canvas.output.items or self == self.canvas.output.log_item:
                 coord = (self.canvas.winfo_width(), self.canvas.winfo_height()/2)
             elif self.connection:
-                x1, y1, x2, y2 = self.canvas.coords(self.canvas[self.connection[0]].ids["arg=" + self.connection[1]])
+                ids = self.canvas[self.connection[0]].ids
+                if "arg=" + self.connection[1] not in ids:
+                    self.hide_wire()
+                    return
+                x1, y1, x2, y2 = self.canvas.coords(ids["arg=" + self.connection[1]])
                 coord = ((x1 + x2)/2, (y1 + y2)/2)
             else:
                 self.hide_wire()
@@ -430,6 +620,12 @@ class Item:
             x - node,y
         )
 
+    def busy(self, is_busy=True):
+        """
+        shows that the item is waiting on a result from one of the scheduler's worker threads
+        """
+        self.config("parent", outline=Color.ORANGE if is_busy else self.canvas.profile.outline(self))
+
     def hide_wire(self):
         self.config("wire", state="hidden")
         self.config("output", fill=Color.EMPTY_NODE)
@@ -449,14 +645,15 @@ class Item:
             height = max(80, num_args * 6 * 6) * self.canvas.zoom
             return width, height
 
-        char = self.text_dimensions(obj)
-        width = min(300, 80 if len(str(obj)) <= 4 else char["width"] * FONT_SIZE) * self.canvas.zoom
+        content = self.content(obj) or ""
+        char = self.text_dimensions(obj, content=content)
+        width = min(300, 80 if len(content) <= 4 else char["width"] * FONT_SIZE) * self.canvas.zoom
         height = (60 + char["height"] * FONT_SIZE) * self.canvas.zoom
 
         return width, height
 
-    def text_dimensions(self, obj, **kwargs):
-        content = self.content(obj, **kwargs)
+    def text_dimensions(self, obj, content=None, **kwargs):
+        content = self.content(obj, **kwargs) if content is None else content
 
         if isinstance(obj, dict):
             return {
@@ -472,23 +669,54 @@ class Item:
     def children(self):
         return [self.ids[j] for j in self.ids]
 
+    def detail(self, is_visible=True):
+        """
+        shows or hides the labels of the item, which are hidden when the node editor is zoomed out
+        """
+        for key in self.ids:
+            role, argname = self.role(key)
+            if key == "value" or role not in ("class", "argname", "argvalue"): continue
+            is_kwarg = argname in self.kwargs.store and argname not in self.args.store
+            self.config(key, state="normal" if is_visible and (not is_kwarg or self.opts["show_kwargs"]) else "hidden")
+
+    def role(self, key):
+        """
+        returns (role, argname) for the canvas object stored in self.ids[key]
+        """
+        if key == "value":
+            return "argvalue", "<value>"
+        if "=" in key:
+            prefix, argname = key.split("=", 1)
+            return ("input" if prefix == "arg" else prefix), argname
+        return key, None
+
     def config(self, *tags, **kwargs):
         if len(tags) == 1:
+            if tags[0] not in self.ids: return None
             return self.canvas.itemconfig(self.ids[tags[0]], **kwargs)
 
         for t in tags:
-            self.canvas.itemconfig(self.ids[t], **kwargs)
+            if t in self.ids:
+                self.canvas.itemconfig(self.ids[t], **kwargs)
 
     def coords(self, tag="parent", *args):
         if tag not in self.ids: return False
         return self.canvas.coords(self.ids[tag], *args)
 
     def position(self):
-        x1, y1, x2, y2 = self.coords()
-        return (x1 + x2)/2, (y1 + y2)/2
+        x, y = self.center
+        return self.canvas.index.to_canvas(x, y, x, y)[:2]
+
+    @property
+    def entry(self):
+        # the Text widget used to edit values is only created once it's needed
+        if self._entry is None:
+            self._entry = Entry(self)
+        return self._entry
 
     def destroy(self):
-        for i in self.children():
-            self.canvas.delete(i)
+        self.erase()
+        self.canvas.index.remove_item(self)
+        self.canvas.profile.remove(self)
         del self.canvas[self.name]
         del self
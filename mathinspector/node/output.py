@@ -21,6 +21,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import numpy as np
 import tkinter as tk
 import pygame
+from functools import partial
 from ..widget import Text
 from ..util import argspec, instanceof
 from ..console.builtin_print import builtin_print
@@ -83,6 +84,7 @@ class Output(tk.Frame):
 
 	def connect(self, item, show_plot=True):
 		self.items.append(item)
+		item.invalidate() # item.value() transforms its result differently when plugged into the output
 		value = item.value()
 		window = plot.get_window(value)
 		if not window and not show_plot:
@@ -100,7 +102,7 @@ class Output(tk.Frame):
 		name = " ".join([i.name for i in self.items])
 
 		if self.is_pixelmap(item.obj):
-			pixelmap_fn = lambda *args: item.obj(*args, **item.kwargs)
+			pixelmap_fn = self.pixelmap(item)
 			if plot.is_active():
 				plot.config(pixelmap=pixelmap_fn)
 			else:
@@ -120,6 +122,7 @@ class Output(tk.Frame):
 	def disconnect(self, item=None):
 		if item is None:
 			for i in self.items:
+				i.invalidate()
 				i.hide_wire()
 				i.config("output", fill=Color.EMPTY_NODE)
 			self.items.clear()
@@ -130,6 +133,7 @@ class Output(tk.Frame):
 				self.log_item = None
 			elif item.name in self.values:
 				del self.values[item.name]
+			item.invalidate()
 			item.hide_wire()
 			item.config("output", fill=Color.EMPTY_NODE)
 
@@ -146,15 +150,25 @@ class Output(tk.Frame):
 			return False
 		return argspec(obj)[0] == ["position", "size", "step"]
 
-	def update_value(self, item):
-		if plot.is_active():
+	def pixelmap(self, item):
+		""" the keyword arguments are bound when the pixelmap is created, so the plot window can cache the tiles for each set of arguments """
+		return partial(item.obj, **{ k: item.kwargs[k] for k in item.kwargs if item.kwargs.store[k] is not None })
+
+	def update_value(self, *items):
+		if not plot.is_active():
+			self.show(items[-1].content(truncate=False), autohide=False)
+			return
+
+		did_change = False
+		for item in items:
 			if self.is_pixelmap(item.obj):
-				plot.config(pixelmap=lambda *args: item.obj(*args, **item.kwargs))
+				plot.config(pixelmap=self.pixelmap(item))
 			else:
 				self.values[item.name] = item.value()
-				plot.update(*list(self.values.values()))
-		else:
-			self.show(item.content(truncate=False), autohide=False)
+				did_change = True
+
+		if did_change:
+			plot.update(*list(self.values.values()))
 
 	def _on_configure(self, event):
 		for i in self.items:
@@ -0,0 +1,78 @@
+"""
+Formats bounded previews of values, so displaying a large object never formats all of it
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from itertools import islice
+
+MAX_SIZE = 1000 # containers with more elements than this are summarized
+EDGE_ITEMS = 3 # the number of elements shown from each end of a summarized container
+MAX_CHARS = 4096 # strings are cut to this many characters before they are formatted
+
+def preview(obj):
+	"""
+	returns str(obj) for small objects.  For large arrays, lists, tuples, dicts and strings only
+	a header with the shape or length, and the elements at each end, are formatted
+	"""
+	if isinstance(obj, np.ndarray):
+		if obj.size <= MAX_SIZE:
+			return str(obj)
+		return ("array of shape " + str(obj.shape) + ", dtype " + str(obj.dtype) + "\n"
+			+ np.array2string(obj, threshold=MAX_SIZE, edgeitems=EDGE_ITEMS))
+
+	if isinstance(obj, (list, tuple)) and len(obj) > MAX_SIZE:
+		start, end = ("[", "]") if isinstance(obj, list) else ("(", ")")
+		return (start + ", ".join(preview(i) for i in obj[:EDGE_ITEMS]) + ", ..., "
+			+ ", ".join(preview(i) for i in obj[-EDGE_ITEMS:]) + end
+			+ " (" + str(len(obj)) + " items)")
+
+	if isinstance(obj, dict) and len(obj) > MAX_SIZE:
+		return ("{" + ", ".join(repr(k) + ": " + preview(obj[k]) for k in islice(obj, 2 * EDGE_ITEMS))
+			+ ", ...} (" + str(len(obj)) + " items)")
+
+	if isinstance(obj, str) and len(obj) > MAX_CHARS:
+		return obj[:MAX_CHARS] + "... (" + str(len(obj)) + " characters)"
+
+	return str(obj)
+
+
+def fulltext(obj):
+	""" the text of obj without summarizing it, which is loaded into the editor when a summarized value is edited """
+	if isinstance(obj, np.ndarray):
+		return np.array2string(obj, threshold=obj.size)
+	return str(obj)
+
+
+def summary(obj):
+	"""
+	returns a smaller copy of large dicts, which is used in place of obj for pretty printing
+	"""
+	if isinstance(obj, dict) and len(obj) > MAX_SIZE:
+		return { k: obj[k] for k in islice(obj, 2 * EDGE_ITEMS) }
+	return obj
+
+
+def is_summarized(obj):
+	""" returns True when preview(obj) doesn't contain all of obj """
+	if isinstance(obj, np.ndarray):
+		return obj.size > MAX_SIZE
+	if isinstance(obj, (list, tuple, dict)):
+		return len(obj) > MAX_SIZE
+	if isinstance(obj, str):
+		return len(obj) > MAX_CHARS
+	return False
@@ -0,0 +1,157 @@
+"""
+Records how long each item in the node editor takes to evaluate
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import sys, time, threading
+from ..style import Color
+
+COLUMNS = ("name", "calls", "total", "mean", "last", "nbytes")
+HEAT = ((0.5, Color.RED), (0.1, Color.ORANGE), (0, Color.INACTIVE))
+
+class Profiler:
+	"""
+	Every time an item in the node editor computes a new value, the wall time, the number
+	of calls and the size of the result are recorded.  Items compute the values plugged into
+	them while they're running, so the time spent in those items is subtracted, and each item
+	is only charged for its own work.  To display a table of the
+	slowest items, use the command
+
+	>>> app.node.profile()
+
+	The table can be sorted by any of its columns
+
+	>>> app.node.profile("calls")
+
+	To tint the outline of each item by how expensive it is, and show the duration of its
+	last evaluation below its class name, use the command
+
+	>>> app.node.profile.show()
+
+	Calling `app.node.profile.show()` a second time hides the overlay again, and
+	`app.node.profile.clear()` resets all of the recorded timings.
+	"""
+	def __init__(self, canvas):
+		self.canvas = canvas
+		self.stats = {}
+		self.is_visible = False
+		self.cost = 0 # the largest total of any item, which the outlines are scaled by
+		self.local = threading.local() # the items which are being computed on each thread
+
+	def __call__(self, sort="total"):
+		return ProfileTable([dict(self.stats[i], mean=self.stats[i]["total"] / self.stats[i]["calls"]) for i in self.stats], sort)
+
+	def __repr__(self):
+		return repr(self())
+
+	def start(self):
+		""" called right before an item computes its value, and followed by a call to record """
+		if not hasattr(self.local, "stack"):
+			self.local.stack = []
+		self.local.stack.append([time.perf_counter(), 0]) # [start time, time spent in nested items]
+
+	def record(self, item, result):
+		start, nested = self.local.stack.pop()
+		elapsed = time.perf_counter() - start
+		if self.local.stack:
+			self.local.stack[-1][1] += elapsed
+		duration = elapsed - nested
+
+		if item.name not in self.stats:
+			self.stats[item.name] = { "name": item.name, "calls": 0, "total": 0, "last": 0, "nbytes": 0 }
+
+		stats = self.stats[item.name]
+		stats["calls"] += 1
+		stats["total"] += duration
+		stats["last"] = duration
+		stats["nbytes"] = result.nbytes if hasattr(result, "nbytes") else sys.getsizeof(result)
+		self.cost = max(self.cost, stats["total"])
+
+	def remove(self, item):
+		""" forgets the timings of an item which was deleted """
+		if self.stats.pop(item.name, None) is not None:
+			self.cost = max([self.stats[i]["total"] for i in self.stats] or [0])
+
+	def clear(self):
+		self.stats.clear()
+		self.cost = 0
+		for i in self.canvas:
+			self.tint(self.canvas[i])
+
+	def show(self, is_visible=None):
+		self.is_visible = not self.is_visible if is_visible is None else is_visible
+		for i in self.canvas:
+			self.tint(self.canvas[i])
+		return self.is_visible
+
+	def outline(self, item):
+		if not self.is_visible or item.name not in self.stats:
+			return Color.INACTIVE
+
+		fraction = self.stats[item.name]["total"] / self.cost if self.cost else 0
+		for threshold, color in HEAT:
+			if fraction >= threshold:
+				return color
+
+	def tint(self, item):
+		text = item.classname
+		if self.is_visible and item.name in self.stats:
+			text += "\n" + duration(self.stats[item.name]["last"])
+		item.config("parent", outline=self.outline(item))
+		item.config("class", text=text)
+
+
+class ProfileTable:
+	def __init__(self, rows, sort="total"):
+		self.rows = rows
+		self.sort(sort)
+
+	def sort(self, key="total", reverse=None):
+		if key not in COLUMNS:
+			raise KeyError("ProfileTable can only be sorted by one of " + ", ".join(COLUMNS))
+		self.rows.sort(key=lambda row: row[key], reverse=(key != "name") if reverse is None else reverse)
+		return self
+
+	def __getitem__(self, key):
+		return self.rows[key]
+
+	def __iter__(self):
+		return iter(self.rows)
+
+	def __len__(self):
+		return len(self.rows)
+
+	def __repr__(self):
+		if not self.rows:
+			return "No items have been evaluated yet"
+
+		width = max(len("name"), *[len(row["name"]) for row in self.rows])
+		lines = [("name".ljust(width) + "".join(i.rjust(12) for i in COLUMNS[1:]))]
+		for row in self.rows:
+			lines.append(row["name"].ljust(width)
+				+ str(row["calls"]).rjust(12)
+				+ duration(row["total"]).rjust(12)
+				+ duration(row["mean"]).rjust(12)
+				+ duration(row["last"]).rjust(12)
+				+ str(row["nbytes"]).rjust(12))
+		return "\n".join(lines)
+
+
+def duration(seconds):
+	if seconds >= 1:
+		return str(round(seconds, 2)) + " s"
+	return str(round(seconds * 1000, 2)) + " ms"
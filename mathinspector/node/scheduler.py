@@ -0,0 +1,212 @@
+"""
+Coalesces changes to items in the node editor and recomputes everything
+downstream of them in a single pass
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..console.kernel import Proxy
+
+MAX_WORKERS = 4
+POLL_INTERVAL = 10 # milliseconds between checks for a finished result from the worker threads
+
+class Scheduler:
+	"""
+	Whenever the inputs of an item change, the item is passed to the scheduler instead of
+	pushing the new value through each connection one hop at a time.  All of the items
+	scheduled during a single tk event are collected, and once the event loop is idle the
+	affected part of the graph is recomputed exactly once, in topological order, followed by
+	a single update of the output.
+
+	>>> app.node.scheduler(app.node["x"])
+
+	The functions in the node editor are evaluated on a pool of worker threads, so the
+	app stays responsive while a slow function is running.  Most numpy and scipy functions
+	release the GIL, so this also lets them make use of more than one core.  Each pass is
+	numbered, and when the inputs change again before a pass has finished, the result
+	of the older pass is thrown away and only the latest result is shown.  A pass which has
+	already started can't be interrupted, but it stops before evaluating its next item once a
+	newer pass is scheduled.  Items which are waiting on a result have an orange outline.  Anything
+	printed by the worker threads is written to the console from the main thread.
+
+	To evaluate everything on the main thread instead, use the command
+
+	>>> app.node.scheduler.is_async = False
+	"""
+	def __init__(self, canvas):
+		self.canvas = canvas
+		self.pending = []
+		self.affected = set()
+		self.after_id = None
+		self.is_async = True
+		self.generation = 0
+		self.running = []
+		self.future = None
+		self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+		self.lock = threading.Lock() # only one pass evaluates items at a time
+
+	def __call__(self, item):
+		if item.name in self.affected or item in self.pending:
+			return
+
+		self.pending.append(item)
+		if self.after_id is None:
+			self.after_id = self.canvas.after_idle(self.flush)
+
+	def flush(self):
+		# a pass which is still running is superseded by this one, so its items are
+		# merged in to make sure they are refreshed once the new result comes in
+		pending = [i for i in self.running + self.pending if self.exists(i)]
+		self.pending = []
+		self.after_id = None
+		order = self.order(pending)
+		self.generation += 1
+
+		if self.future:
+			self.future.cancel()
+
+		self.fetch(order)
+		if not self.is_async:
+			self.evaluate(order)
+			self.finish(order)
+			return
+
+		self.running = order
+		for item in order:
+			item.busy()
+
+		self.future = self.executor.submit(self.evaluate, order, self.generation)
+		self.poll(self.future, order, self.generation)
+
+	def fetch(self, order):
+		"""
+		copies the values of the kernel variables used by a pass into the app before it starts, since
+		the pipe to the kernel can only be read from the main thread
+		"""
+		items, seen = list(order), set()
+		while items:
+			item = items.pop()
+			if item.name in seen: continue
+			seen.add(item.name)
+			for value in [item.obj] + list(item.args.store.values()) + list(item.kwargs.store.values()):
+				if isinstance(value, Proxy):
+					try:
+						value.value()
+					except Exception as err:
+						print (err)
+			items.extend(self.upstream(item))
+
+	def evaluate(self, order, generation=None):
+		with self.lock:
+			for item in order:
+				if generation is not None and generation != self.generation:
+					return
+				if self.exists(item):
+					item.value()
+
+	def poll(self, future, order, generation):
+		self.canvas.app.console.flush()
+		if generation != self.generation:
+			return
+
+		if not future.done():
+			self.canvas.after(POLL_INTERVAL, lambda: self.poll(future, order, generation))
+			return
+
+		self.running = []
+		self.future = None
+		for item in order:
+			if self.exists(item):
+				item.busy(False)
+
+		if future.exception():
+			print (future.exception())
+		self.finish(order)
+
+	def finish(self, order):
+		outputs = []
+		self.affected = set(i.name for i in order)
+		for item in order:
+			if not self.exists(item): continue
+			if any(i.name in self.affected for i in self.upstream(item)):
+				item.refresh()
+			item.resize()
+			if item in self.canvas.output.items:
+				outputs.append(item)
+			if self.canvas.profile.is_visible:
+				self.canvas.profile.tint(item)
+
+		self.affected = set()
+		if outputs:
+			self.canvas.output.update_value(*outputs)
+
+	def order(self, items):
+		"""
+		returns every item downstream of `items` (including the items themselves) sorted so
+		that each item comes after all of the items it depends on
+		"""
+		nodes = {}
+		for item in items:
+			while item and item.name not in nodes:
+				nodes[item.name] = item
+				item = self.downstream(item)
+
+		indegree = { name: 0 for name in nodes }
+		for item in nodes.values():
+			target = self.downstream(item)
+			if target and target.name in nodes:
+				indegree[target.name] += 1
+
+		queue = [nodes[name] for name in nodes if indegree[name] == 0]
+		result = []
+		while queue:
+			item = queue.pop(0)
+			result.append(item)
+			target = self.downstream(item)
+			if target and target.name in nodes:
+				indegree[target.name] -= 1
+				if indegree[target.name] == 0:
+					queue.append(target)
+
+		if len(result) < len(nodes):
+			print (Exception("NodeEditorError: cycle detected between " + ", ".join(name for name in nodes if indegree[name] > 0)))
+		return result
+
+	def creates_cycle(self, upstream, item):
+		"""
+		returns True when connecting the output of `upstream` into `item` would create a loop
+		"""
+		seen = set()
+		while item and item.name not in seen:
+			if item == upstream:
+				return True
+			seen.add(item.name)
+			item = self.downstream(item)
+		return False
+
+	def downstream(self, item):
+		if item.connection and item.connection[0] in self.canvas:
+			return self.canvas[item.connection[0]]
+		return None
+
+	def upstream(self, item):
+		return list(item.args["connection"].values()) + list(item.kwargs["connection"].values())
+
+	def exists(self, item):
+		return item.name in self.canvas and self.canvas[item.name] is item
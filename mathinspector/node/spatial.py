@@ -0,0 +1,132 @@
+"""
+A spatial index of the items in the node editor, used for hit testing
+without searching through every item on the canvas
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+CELL_SIZE = 128
+
+class SpatialIndex:
+	"""
+	Stores the bounding box of each item, input and output in a uniform grid.  The boxes
+	are stored in world coordinates, which don't change when the node editor is panned
+	or zoomed, so only `Item.move`, `Item.resize` and `Item.destroy` need to update the index.
+	Looking up the closest input to the mouse cursor only has to check the handful of
+	grid cells around the cursor, no matter how many items are in the node editor.
+
+	Each entry stores a tuple `(item, role, argname)` where role is one of "parent", "input"
+	or "output".  Inputs and outputs are keyed by their canvas id and only exist while the item
+	is drawn, while the bounding box of an item is keyed by the item itself, so that items which
+	are off screen can still be found by `NodeEditor.cull`
+	"""
+	def __init__(self, canvas):
+		self.canvas = canvas
+		self.cells = {}
+		self.entries = {}
+		self.owners = {}
+		self.origin = (0, 0)
+
+	def insert(self, key, bbox, item, role, argname=None):
+		self.remove(key)
+		bbox = self.to_world(*bbox)
+		self.entries[key] = bbox, (item, role, argname)
+		for cell in self.cells_in(*bbox):
+			self.cells.setdefault(cell, set()).add(key)
+		self.owners.setdefault(item, set()).add(key)
+
+	def remove(self, key):
+		if key not in self.entries: return
+		bbox, (item, role, argname) = self.entries.pop(key)
+		for cell in self.cells_in(*bbox):
+			self.cells[cell].discard(key)
+			if not self.cells[cell]:
+				del self.cells[cell]
+		self.owners[item].discard(key)
+		if not self.owners[item]:
+			del self.owners[item]
+
+	def remove_item(self, item):
+		for key in list(self.owners.get(item, ())):
+			self.remove(key)
+
+	def move_item(self, item, x, y):
+		zoom = self.canvas.zoom
+		for key in list(self.owners.get(item, ())):
+			(x1, y1, x2, y2), data = self.entries[key]
+			self.insert(key, self.to_canvas(x1 + x/zoom, y1 + y/zoom, x2 + x/zoom, y2 + y/zoom), *data)
+
+	def pan(self, x, y):
+		x0, y0 = self.origin
+		self.origin = x0 + x, y0 + y
+
+	def scale(self, x, y, factor):
+		""" call this before updating canvas.zoom """
+		x0, y0 = self.origin
+		self.origin = x + factor*(x0 - x), y + factor*(y0 - y)
+
+	def nearest(self, x, y, radius, role=None):
+		"""
+		returns (key, (item, role, argname)) for the entry with the closest center to the point (x,y)
+		within `radius`, or None if there aren't any
+		"""
+		result, distance = None, None
+		for key in self.query(x - radius, y - radius, x + radius, y + radius):
+			bbox, data = self.entries[key]
+			if role and data[1] != role: continue
+			x1, y1, x2, y2 = self.to_canvas(*bbox)
+			d = ((x1 + x2)/2 - x)**2 + ((y1 + y2)/2 - y)**2
+			if d <= radius**2 and (distance is None or d < distance):
+				result, distance = (key, data), d
+		return result
+
+	def find(self, x, y, role=None):
+		"""
+		returns (key, (item, role, argname)) for an entry which contains the point (x,y), or None
+		"""
+		for key in self.query(x, y, x, y):
+			bbox, data = self.entries[key]
+			if role and data[1] != role: continue
+			x1, y1, x2, y2 = self.to_canvas(*bbox)
+			if x1 <= x <= x2 and y1 <= y <= y2:
+				return key, data
+		return None
+
+	def query(self, x1, y1, x2, y2):
+		result = set()
+		for cell in self.cells_in(*self.to_world(x1, y1, x2, y2)):
+			if cell in self.cells:
+				result.update(self.cells[cell])
+		return result
+
+	def bbox(self, key):
+		return self.to_canvas(*self.entries[key][0])
+
+	def cells_in(self, x1, y1, x2, y2):
+		for i in range(int(x1 // CELL_SIZE), int(x2 // CELL_SIZE) + 1):
+			for j in range(int(y1 // CELL_SIZE), int(y2 // CELL_SIZE) + 1):
+				yield i, j
+
+	def to_world(self, x1, y1, x2, y2):
+		x0, y0 = self.origin
+		zoom = self.canvas.zoom
+		return (min(x1, x2) - x0)/zoom, (min(y1, y2) - y0)/zoom, (max(x1, x2) - x0)/zoom, (max(y1, y2) - y0)/zoom
+
+	def to_canvas(self, x1, y1, x2, y2):
+		x0, y0 = self.origin
+		zoom = self.canvas.zoom
+		return x0 + x1*zoom, y0 + y1*zoom, x0 + x2*zoom, y0 + y2*zoom
@@ -0,0 +1,132 @@
+"""
+Evaluates an item in the node editor over a whole range of values for one of its arguments
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from ..plot import plot
+
+DELAY = 0.01
+
+class Sweep:
+	"""
+	The results of calling an item for every value in `values`, stacked along the first axis.
+	The results are computed all at once, so stepping through them in the plot window doesn't
+	evaluate anything.
+
+	>>> sweep = app.node.sweep("sin", "x", linspace(0, 1, 100))
+	>>> sweep.show(50)
+	>>> sweep.play()
+
+	A sweep can be used anywhere an ndarray can, or saved along with its values
+
+	>>> sweep.save("sweep.npz")
+	"""
+	def __init__(self, item, argname, values, executor=None):
+		self.item = item
+		self.name = item.name
+		self.argname = argname
+		self.values = np.asarray(values)
+		if np.ndim(self.values) == 0 or len(self.values) == 0:
+			raise ValueError("a sweep needs at least one value")
+		self.args = { j: item.args[j] for j in item.args }
+		self.kwargs = { k: item.kwargs[k] for k in item.kwargs if item.kwargs.store[k] is not None }
+		self.results = self.evaluate(executor)
+		self.frame = 0
+
+	def __array__(self, dtype=None):
+		return self.results if dtype is None else self.results.astype(dtype)
+
+	def __getitem__(self, key):
+		return self.results[key]
+
+	def __len__(self):
+		return len(self.results)
+
+	def __repr__(self):
+		return "Sweep(" + self.name + ", " + self.argname + ", " + str(len(self.values)) + " values, shape=" + str(np.shape(self.results)) + ")"
+
+	def call(self, value):
+		args, kwargs = dict(self.args), dict(self.kwargs)
+		if self.argname in args:
+			args[self.argname] = value
+		else:
+			kwargs[self.argname] = value
+		return self.item.obj(*args.values(), **kwargs)
+
+	def evaluate(self, executor=None):
+		"""
+		functions which broadcast, like numpy's ufuncs, are called a single time with the values
+		reshaped along a new first axis.  The result has to have one row with the shape of a single
+		result for each value, and the first, middle and last rows are checked against individual
+		calls.  When they don't match, or the function doesn't accept arrays, each value is
+		evaluated on its own using the worker pool
+		"""
+		n = len(self.values)
+		checked = { i: self.call(self.values[i]) for i in sorted(set((0, n // 2, n - 1))) }
+		try:
+			result = np.asarray(self.call(self.values.reshape((n,) + (1,) * np.ndim(checked[0]))))
+			if (result.shape == (n,) + np.shape(checked[0])
+				and all(np.allclose(result[i], checked[i], equal_nan=True) for i in checked)
+			):
+				return result
+		except Exception as err:
+			pass
+
+		rest = [self.values[i] for i in range(n) if i not in checked]
+		computed = iter(executor.map(self.call, rest) if executor else map(self.call, rest))
+		results = [checked[i] if i in checked else next(computed) for i in range(n)]
+		try:
+			return np.stack(results)
+		except Exception as err:
+			result = np.empty(len(results), dtype=object)
+			result[:] = results
+			return result
+
+	def save(self, file):
+		np.savez(file, values=self.values, results=self.results)
+
+	def data(self, i):
+		"""
+		returns what the plot window should draw for the i-th result, which works the same
+		way as an item plugged into the output of the node editor
+		"""
+		result = self.results[i]
+		args = list(self.args.keys())
+		if args and np.ndim(result) == 1 and not np.iscomplexobj(result):
+			arg = self.values[i] if args[0] == self.argname else self.args[args[0]]
+			if np.ndim(arg) == 1 and len(arg) == len(result):
+				return np.array([(arg[j], result[j]) for j in range(len(result))])
+		return result
+
+	def show(self, i=None):
+		""" draws the i-th result in the plot window """
+		self.frame = self.frame if i is None else i % len(self.results)
+		if plot.is_active():
+			plot.update(self.data(self.frame))
+		else:
+			plot(self.data(self.frame))
+
+	def play(self, delay=DELAY, start=0):
+		""" steps through every result in the plot window, starting from `start` """
+		self.show(start)
+		def step():
+			if self.frame + 1 >= len(self.results):
+				return False
+			self.frame += 1
+			return [self.data(self.frame)]
+		plot.animate(delay, step)
@@ -44,6 +44,8 @@ from .util import vdict, Color, argspec, classname, fontcolor
 from .config import open_editor, BUTTON_RIGHT, BUTTON_RELEASE_RIGHT
 from .style import TREE_TAGS
 from .widget import Treeview, TreeEntry
+from .node.preview import preview
+from .console.kernel import Proxy
 
 class ObjectTree(vdict, Treeview):
 	"""
@@ -75,11 +77,14 @@ class ObjectTree(vdict, Treeview):
 	about the available keyword arguments
 	"""
 	def __init__(self, app, *args, **kwargs):
-		vdict.__init__(self, *args, setitem=self.setobj, delitem=self.delete)
+		vdict.__init__(self, *args, setitem=self.setobj, delitem=self.delete, journal=True)
 		Treeview.__init__(self, app, *args, **kwargs)
 
 		self.drag = None
 		self.entry = TreeEntry(self)
+		self.rows = {} # name -> { key: (text, tags) } for the rows currently in the tree
+		self.structure = {} # name -> the layout of the rows of each object, see ObjectTree.layout
+		self.stale = set() # objects whose constants changed while the constants row was closed
 
 		for i in TREE_TAGS:
 			self.tag_configure(i, **TREE_TAGS[i])
@@ -93,6 +98,7 @@ class ObjectTree(vdict, Treeview):
 		self.bind("<Double-Button-1>", self._on_double_button_1)
 		self.bind(BUTTON_RIGHT, self._on_button_right)
 		self.bind(BUTTON_RELEASE_RIGHT, self._on_button_release_right)
+		self.bind("<<TreeviewOpen>>", self._on_open, add="+")
 
 	def setobj(self, name, value, create_new=False, coord=None, is_binop=False):
 		"""
@@ -122,67 +128,144 @@ class ObjectTree(vdict, Treeview):
 		"""
 		name = self.unique_name(name) if create_new else name
 		prev = self.app.node[name] if name in self.app.node else None
-		order = self.order()
-		expanded = self.expanded()
 		update_value = prev and prev.argspec == argspec(value) and prev.classname == classname(value)
 		is_output_item = prev in self.app.node.output.items or prev == self.app.node.output.log_item
 		self.store[name] = value
+		if self.app.console.kernel and not isinstance(value, Proxy):
+			self.app.console.kernel.assign(name, value)
 		if is_output_item and not update_value:
 			self.app.node.output.disconnect(prev)
 			is_output_item = False
 		self.app.node.setitem(name, update_value=update_value, coord=coord, is_output_item=is_output_item)
 
-		if update_value and self.exists(name + "<arg=<value>>"):
-			self.item(name + "<arg=<value>>",
-				text=str(value),
-				tags=("editable", fontcolor(value, as_string=True)))
-			return
+		item = self.app.node[name]
+		if self.exists(name) and self.structure.get(name) == self.layout(item, value):
+			self.update_rows(name, item, value)
+		else:
+			self.build_rows(name, item, value)
+
+		if create_new:
+			return name
+		return False
 
+	def layout(self, item, value):
+		"""
+		the rows of an object only have to be rebuilt when this changes, otherwise only
+		the text of the rows which changed is updated
+		"""
+		return type(value), item.is_callable, tuple(item.args.store), tuple(item.kwargs.store)
+
+	def setrow(self, name, key, text, tags):
+		""" updates the row `key`, without calling into tk when nothing has changed """
+		if name not in self.rows or key not in self.rows[name]: return
+		if self.rows[name][key] == (text, tags): return
+		self.rows[name][key] = text, tags
+		self.item(key, text=text, tags=tags)
+
+	def update_rows(self, name, item, value):
+		if not item.is_callable:
+			self.setrow(name, name + "<arg=<value>>", preview(value), ("editable", fontcolor(value, as_string=True)))
+		else:
+			for attr in (item.args, item.kwargs):
+				for j in attr:
+					self.setrow(name, name + "<arg=" + j + ">", preview(attr[j]), ("editable", fontcolor(attr[j], as_string=True)))
+
+		if self.exists(name + "<constants>") and self.item(name + "<constants>", "open"):
+			self.update_constants(name, value)
+		else:
+			self.stale.add(name)
+
+	def update_constants(self, name, value):
+		self.stale.discard(name)
+		for key in self.get_children(name + "<constants>"):
+			if key not in self.rows[name]: continue
+			j = key[len(name) + 1:]
+			try:
+				text = j + ": " + preview(getattr(value, j))
+			except Exception as err:
+				text = j + ": " + type(err).__name__
+			self.setrow(name, key, text, ("no_hover",))
+
+	def build_rows(self, name, item, value):
+		"""
+		replaces every row of an object, keeping its position in the tree and which of its rows
+		were expanded
+		"""
+		index, expanded = "end", []
 		if self.exists(name):
-			super(Treeview, self).delete(name)
+			index = self.index(name)
+			expanded = [i for i in (name, name + "<kwargs>", name + "<methods>", name + "<constants>") if self.exists(i) and self.item(i, "open")]
+			Treeview.delete(self, name)
 
-		item = self.app.node[name]
+		self.rows[name] = {}
+		self.structure[name] = self.layout(item, value)
+		self.stale.discard(name)
+
+		def insert(parent, iid, text, tags=()):
+			self.rows[name][iid] = text, tags
+			return self.insert(parent, index if parent == "" else "end", iid, text=text, tags=tags)
 
-		self.insert("", "end", name, text=name, tags=("object", "doc"))
-		self.insert(name, "end", name + "<class>", text=item.classname, tags=("class", "no_hover"))
+		insert("", name, name, ("object", "doc"))
+		insert(name, name + "<class>", item.classname, ("class", "no_hover"))
 		if not item.is_callable:
-			self.insert(name, "end", name + "<arg=<value>>", text=str(value), tags=("editable", fontcolor(value, as_string=True)))
+			insert(name, name + "<arg=<value>>", preview(value), ("editable", fontcolor(value, as_string=True)))
 
 		if item.is_callable:
 			for j in item.args:
-				self.insert(name, "end", name + "<argname=" + j + ">", text=j,
-					tags=("argname", "no_hover"))
-				self.insert(name, "end", name + "<arg=" + j + ">",
-					text=str(item.args[j]),
-					tags=("editable", fontcolor(item.args[j], as_string=True)))
+				insert(name, name + "<argname=" + j + ">", j, ("argname", "no_hover"))
+				insert(name, name + "<arg=" + j + ">", preview(item.args[j]), ("editable", fontcolor(item.args[j], as_string=True)))
 
 			if len(item.kwargs) > 0:
-				kwargs = self.insert(name, "end", name + "<kwargs>", text="kwargs")
+				kwargs = insert(name, name + "<kwargs>", "kwargs")
 				for k in item.kwargs:
-					self.insert(kwargs, "end", name + "<argname=" + k + ">", text=k,
-						tags=("kwargname", "no_hover"))
-					self.insert(kwargs, "end", name + "<arg=" + k + ">",
-						text=str(item.kwargs[k]),
-						tags=("editable", fontcolor(item.kwargs[k], as_string=True)))
-
+					insert(kwargs, name + "<argname=" + k + ">", k, ("kwargname", "no_hover"))
+					insert(kwargs, name + "<arg=" + k + ">", preview(item.kwargs[k]), ("editable", fontcolor(item.kwargs[k], as_string=True)))
+
+		# the attributes are only looked up once one of these rows is opened, since properties
+		# can be expensive to compute
+		insert(name, name + "<methods>", "methods")
+		self.lazy(name + "<methods>", lambda key: self.insert_rows(key,
+			[{ "iid": name + "." + j, "text": j, "tags": ("doc",) } for j in self.attributes(value, callable)],
+			lambda parent, index, **row: insert(parent, **row)))
+
+		insert(name, name + "<constants>", "constants")
+		self.lazy(name + "<constants>", lambda key: self.insert_constants(name, self.attributes(value, lambda attr: not callable(attr))))
+
+		for i in expanded:
+			if self.exists(i):
+				self.expand(i)
+
+	def attributes(self, value, predicate):
+		""" the names of the public attributes of value for which predicate is True """
+		result = []
 		for j in dir(value):
 			if j[:1] != "_":
-				attr = getattr(value, j)
-				if callable(attr):
-					if not self.exists(name + "<methods>"):
-						self.insert(name, "end", name + "<methods>", text="methods")
-					self.insert(name + "<methods>", "end", name + "." + j, text=j, tags="doc")
-				else:
-					if not self.exists(name + "<constants>"):
-						self.insert(name, "end", name + "<constants>", text="constants")
-					self.insert(name + "<constants>", "end", name + "." + j, text=j + ": " + str(attr), tags="no_hover")
-
-		self.order(order)
-		self.expanded(expanded)
-
-		if create_new:
-			return name
-		return False
+				try:
+					attr = getattr(value, j)
+				except Exception as err:
+					attr = None
+				if predicate(attr):
+					result.append(j)
+		return result
+
+	def insert_constants(self, name, constants):
+		""" the constants of an object aren't formatted until the rows they are in are inserted """
+		self.stale.discard(name)
+		def insert(parent, index, iid, attr):
+			try:
+				text = attr + ": " + preview(getattr(self.store[name], attr))
+			except Exception as err:
+				text = attr + ": " + type(err).__name__
+			self.rows[name][iid] = text, ("no_hover",)
+			self.insert(parent, index, iid, text=text, tags=("no_hover",))
+
+		self.insert_rows(name + "<constants>", [{ "iid": name + "." + j, "attr": j } for j in constants], insert)
+
+	def _on_open(self, event):
+		key = self.focus()
+		if key[-len("<constants>"):] == "<constants>" and key[:-len("<constants>")] in self.stale:
+			name = key[:-len("<constants>")]
+			self.update_constants(name, self.store[name])
 
 	def delete(self, key):
 		if key in self.app.node:
@@ -192,7 +275,10 @@ class ObjectTree(vdict, Treeview):
 				item.args["connection"][i].disconnect()
 			for k in item.kwargs["connection"]:
 				item.kwargs["connection"][k].disconnect()
-		super(Treeview, self).delete(key)
+		Treeview.delete(self, key)
+		self.rows.pop(key, None)
+		self.structure.pop(key, None)
+		self.stale.discard(key)
 		self.app.node[key].destroy()
 
 	def unique_name(self, name):
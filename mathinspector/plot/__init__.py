@@ -9,6 +9,11 @@ You can hold down the right mouse button and move the cursor to pan around, and
 scroll wheel to zoom in and out.  Various options are available in the Plot section of the main
 menu.
 
+The plot window sleeps while nothing is changing, and while moving or animating it draws at most
+60 frames per second, which can be changed with
+
+>>> plot.config(fps=30)
+
 To draw a line in three dimensional space from the origin to the point (10,10,10), use the command
 
 >>> plot([(0,0,0), (10,10,10)])
@@ -45,16 +50,17 @@ An example of a pixelmap function is the Domain Coloring function
 >>> from mathinspector.examples import domain_coloring
 >>> plot(pixelmap=domain_coloring)
 
-Animating pixelmaps is very computationally expensive, and the
-`multiprocess` module is used to try and do as much of the computation in the background
-as possible.  The plot window creates an offscreen surface for the purpose
-of panning and zooming, and after movement stops for 1 second, it recalculates
-the pixels for the current position, while also recomputing the pixels for the
-offscreen surface in the background.  This system currently suffers from some flashing and
-resolution artifacts which are hard to miss when moving very quickly.
-
-Look for video rendering functionality in an upcoming release to address the
-performance issues associated with the most computationally expensive animations.
+The pixels are computed in square tiles which are kept in a cache, so panning or zooming
+back to a region which was already drawn doesn't call the pixelmap again.  While the view
+is moving, the pixelmap is only computed at 1/8 of the resolution.  Once movement stops, it's
+refined to 1/4, 1/2 and finally full resolution, and any movement cancels the refinement.
+The tiles are computed in parallel by a pool of processes, one per cpu core.  Pixelmaps
+which can't be pickled, like lambdas defined in the console, are computed in the plot
+window's own process instead.
+
+Animating pixelmaps is still very computationally expensive, look for video rendering
+functionality in an upcoming release to address the performance issues associated with
+the most computationally expensive animations.
 """
 """
 Copyright (C) 2021 Matt Calhoun
@@ -0,0 +1,60 @@
+"""
+Paces the main loop of the plot windows, so a plot which isn't changing doesn't use any cpu
+
+While something is moving or animating, frames are limited to OPTIONS["fps"].  Otherwise the
+loop sleeps until the next event arrives.  The plot window runs on the same thread as the rest
+of the app, so while the window isn't focused, OPTIONS["on_update"] is called to keep the app
+responsive, at most once every UPDATE_INTERVAL seconds.
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import time
+import pygame
+
+FPS = 60 # the default frame rate limit while a plot is moving
+UPDATE_INTERVAL = 1/30 # seconds between calls to on_update while the plot window isn't focused
+
+class FrameClock:
+	def __init__(self, options):
+		self.options = options
+		self.clock = pygame.time.Clock()
+		self.last_update = 0
+
+	def events(self, is_active, is_focused):
+		"""
+		returns the events for the next frame.  When is_active is False this blocks until an event
+		arrives, or until on_update is due when the window isn't focused
+		"""
+		if is_active:
+			self.clock.tick(self.options["fps"])
+			return pygame.event.get()
+
+		if is_focused or not self.options["on_update"]:
+			return [pygame.event.wait()] + pygame.event.get()
+
+		timeout = self.last_update + UPDATE_INTERVAL - time.monotonic()
+		event = pygame.event.wait(max(1, int(1000*timeout)))
+		return [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+
+	def update(self, is_focused):
+		""" calls on_update when the window isn't focused and it's been UPDATE_INTERVAL seconds since the last call """
+		if is_focused or not self.options["on_update"]:
+			return
+		now = time.monotonic()
+		if now - self.last_update >= UPDATE_INTERVAL:
+			self.last_update = now
+			self.options["on_update"]()
@@ -14,11 +14,13 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import pygame, os, platform
+import pygame, os, math, platform
 import numpy as np
-import multiprocessing as mp
-from ..config import SYSTEM, MULTIPROCESS_CONTEXT, ZOOM_MODIFIER
+from ..config import ZOOM_MODIFIER
 from ..util import instanceof, hex_to_rgb
+from concurrent.futures.process import BrokenProcessPool
+from . import tiles
+from .clock import FrameClock, FPS
 from pygame.locals import *
 from pygame._sdl2.video import Window
 
@@ -32,6 +34,7 @@ WHITE = pygame.Color(*hex_to_rgb("f8f8f2"))
 BLUE = pygame.Color(*hex_to_rgb("60d9f1"))
 VERY_DARK_GREY = pygame.Color(*hex_to_rgb("75715d"))
 RADIUS = 4
+ROUGH = 3 # while the view is moving, the pixelmap is computed at 1/2**ROUGH of the final resolution
 
 OPTIONS = {
 	"title": "Math Inspector",
@@ -41,7 +44,8 @@ OPTIONS = {
 	"size": (1280, 720),
 	"position": None,
 	"step": 1/128,
-	"timeout": 1,
+	"timeout": 0.25,
+	"fps": FPS,
 	"on_update": None,
 	"on_close": None,
 	"pixelmap": None,
@@ -58,20 +62,16 @@ class SDLWindow:
 		self.scale = 1
 		self.args = []
 		self.spacing = 1 / OPTIONS["step"]
-		if SYSTEM not in ("Windows", "Linux"):
-			self.ctx = mp.get_context(MULTIPROCESS_CONTEXT)
-			self.queue = self.ctx.Queue()
-
-	def get_pixels(self, res, size):
-		x0, y0 = OPTIONS["position"]
-		w, h = OPTIONS["size"]
-		step = OPTIONS["step"]
-		return OPTIONS["pixelmap"](((-x0+w/2)*step, (y0-h/2)*step), (w*size*step,h*size*step), res*step)
+		self.tile_cache = tiles.TileCache()
+		self.pool = None
+		self.batch = None
+		self.serial = set() # the keys of pixelmaps which can't be computed in the pool
+		self.failed = set() # the keys of pixelmaps which raised an exception, until the pixelmap or its arguments change
 
 	def draw_pixels(self):
-		w,h = OPTIONS["size"]
-		pix = self.get_pixels(1,1)
-		pygame.surfarray.blit_array(self.screen, pix[0:w,0:h])
+		self.screen.fill(BACKGROUND)
+		if OPTIONS["pixelmap"] is not None:
+			self.draw_tiles()
 		if OPTIONS["show_grid"]:
 			self.draw_grid()
 		for values in self.args:
@@ -80,20 +80,106 @@ class SDLWindow:
 			self.draw_range()
 		pygame.display.flip()
 
-	def update_offscreen(self, res=1, size=3):
-		if self.is_processing or SYSTEM in ("Windows", "Linux"): return
-		self.is_processing = True
-		w,h = OPTIONS["size"]
-		self.coords.append([w/self.pan_res,h/self.pan_res,res])
-		process = self.ctx.Process(target=self.process_target, args=(res,size))
-		process.start()
-
-	def process_target(self, res, size):
-		self.queue.put(self.get_pixels(res,size))
+	def draw_tiles(self):
+		"""
+		draws the tiles in the cache for each of the levels in self.levels(), from the roughest to
+		the finest, so the missing tiles of a level show the rougher tiles underneath
+		"""
+		x0, y0 = OPTIONS["position"]
+		w, h = OPTIONS["size"]
+		step = OPTIONS["step"]
+		key = tiles.pixelmap_key(OPTIONS["pixelmap"])
+		screen = self.screen.get_rect()
+
+		for n in self.levels():
+			r = step / 2.0**n
+			for tx, ty in tiles.visible(x0, y0, w, h, step, n):
+				surf = self.tile_cache.get((key, n, tx, ty))
+				if surf is None: continue
+				tw, th = surf.get_size()
+				left, top = x0 + tx*tiles.TILE_SIZE/r, y0 + ty*tiles.TILE_SIZE/r
+				if r == 1:
+					self.screen.blit(surf, (round(left), round(top)))
+					continue
+
+				# only the part of the tile which is on the screen is scaled
+				clip = pygame.Rect(round(left), round(top), round(tw/r), round(th/r)).clip(screen)
+				if not clip.w or not clip.h: continue
+				sx0, sy0 = max(0, math.floor((clip.left - left)*r)), max(0, math.floor((clip.top - top)*r))
+				sx1, sy1 = min(tw, math.ceil((clip.right - left)*r)), min(th, math.ceil((clip.bottom - top)*r))
+				dx0, dy0 = round(left + sx0/r), round(top + sy0/r)
+				dx1, dy1 = round(left + sx1/r), round(top + sy1/r)
+				if sx1 > sx0 and sy1 > sy0 and dx1 > dx0 and dy1 > dy0:
+					area = surf.subsurface((sx0, sy0, sx1 - sx0, sy1 - sy0))
+					self.screen.blit(pygame.transform.scale(area, (dx1 - dx0, dy1 - dy0)), (dx0, dy0))
+
+	def levels(self):
+		"""
+		the levels which are computed for the current step, from the rough level used while the
+		view is moving to the final one, which is set by OPTIONS["resolution"]
+		"""
+		n = tiles.level(OPTIONS["step"])
+		final = n + max(0, round(math.log2(OPTIONS["resolution"])))
+		return list(range(max(n + ROUGH, final), final - 1, -1))
+
+	def refine(self, is_idle, wait=False):
+		"""
+		computes the missing tiles of the current view one level at a time.  Only the rough level
+		is computed until the view is idle.  Returns True when new tiles were added to the cache
+		"""
+		if self.batch is None:
+			self.batch = self.next_batch(is_idle)
+			if self.batch is None:
+				return False
+		if wait:
+			self.batch.wait()
+		if not self.batch.done():
+			return False
+
+		batch, self.batch = self.batch, None
+		for future in batch.futures:
+			if not future.cancelled() and future.exception():
+				# the tiles are computed again in this process, which raises the error if it came from the pixelmap
+				if isinstance(future.exception(), BrokenProcessPool):
+					self.pool.shutdown()
+					self.pool = None
+				self.serial.add(batch.key)
+				return True
+
+		for (tx, ty), pixels in batch.results():
+			surf = pygame.Surface(pixels.shape[:2])
+			pygame.surfarray.blit_array(surf, pixels)
+			self.tile_cache.put((batch.key, batch.n, tx, ty), surf, surf.get_bytesize() * surf.get_width() * surf.get_height())
+		return True
+
+	def next_batch(self, is_idle):
+		"""
+		starts computing the tiles of the roughest level which isn't complete, in parallel when the
+		pixelmap can be sent to the process pool, and otherwise in this process
+		"""
+		x0, y0 = OPTIONS["position"]
+		w, h = OPTIONS["size"]
+		pixelmap = OPTIONS["pixelmap"]
+		key = tiles.pixelmap_key(pixelmap)
+		levels = self.levels()
+		if key in self.failed:
+			return None
+
+		for n in levels if is_idle else levels[:1]:
+			missing = [i for i in tiles.visible(x0, y0, w, h, OPTIONS["step"], n) if (key, n) + i not in self.tile_cache]
+			if not missing: continue
+			if key not in self.serial and tiles.picklable(pixelmap):
+				if self.pool is None:
+					self.pool = tiles.TilePool()
+				return self.pool.submit(key, pixelmap, n, missing)
+			return tiles.computed(key, pixelmap, n, missing)
+		return None
 
 	def plot(self, *args, **kwargs):
 		self.args = args
 		OPTIONS.update(kwargs)
+		if "pixelmap" in kwargs:
+			self.failed.clear()
 		w, h = OPTIONS["size"]
 
 		pygame.init()
@@ -108,25 +194,18 @@ class SDLWindow:
 		is_running = True
 		is_focused = True
 		did_change = True
-		offscreen_surf = None
-		self.pan_res = 1
-		pixels = None
-		self.coords = [[w/3, h/3, self.pan_res]]
-		mode = None
-		self.is_processing = False
 		timer = 0
 		animation_timer = 0
 		request_quit = False
 		last_tick = 0
-		clock = pygame.time.Clock()
+		clock = FrameClock(OPTIONS)
 
 		if OPTIONS["on_update"]:
 			OPTIONS["on_update"]()
 
 		if OPTIONS["pixelmap"]:
-			offscreen_surf = pygame.Surface((0,0))
-			offscreen_size = offscreen_surf.get_size()
 			try:
+				while self.refine(False, wait=True): pass
 				self.draw_pixels()
 			except Exception as err:
 				if OPTIONS["on_close"]:
@@ -134,16 +213,19 @@ class SDLWindow:
 				pygame.display.quit()
 				print (err)
 				return
-			self.update_offscreen()
 			did_change = False
 
 		while is_running:
+			is_active = did_change or self.is_animation_running or (
+				OPTIONS["pixelmap"] is not None and (self.batch is not None or timer < OPTIONS["timeout"]))
+			events = clock.events(is_active, is_focused)
+
 			tick = pygame.time.get_ticks()/1000
 			delta_time = tick - last_tick
 			last_tick = tick
 
 			keypress = pygame.key.get_pressed()
-			for event in pygame.event.get(pump=False):
+			for event in events:
 				if event.type == pygame.ACTIVEEVENT:
 					is_focused = bool(event.gain)
 					# is_focused = not bool(event.state)
@@ -153,26 +235,16 @@ class SDLWindow:
 				elif event.type == pygame.MOUSEMOTION:
 					if event.buttons[2]:
 						did_change = True
-						mode = "pan"
 						x0 += event.rel[0]
 						y0 += event.rel[1]
-						for i, val in enumerate(self.coords):
-							self.coords[i][0] -= event.rel[0]/val[2]
-							self.coords[i][1] -= event.rel[1]/val[2]
 				elif event.type == pygame.MOUSEWHEEL:
 					did_change = True
-					mode = "zoomin" if event.y > 0 else "zoomout"
 					delta = event.y*ZOOM_MODIFIER/SPACING
 					self.zoom *= 1 + delta
 					x, y = pygame.mouse.get_pos()
 					x0 += delta*(x0 - x)
 					y0 += delta*(y0 - y)
 
-					for i, val in enumerate(self.coords):
-						self.coords[i][2] *= 1 + delta
-						self.coords[i][0] += x*delta/val[2]
-						self.coords[i][1] += y*delta/val[2]
-
 					if self.scale * self.zoom > 1:
 						self.scale /= 2
 					elif self.scale * self.zoom < 1/2:
@@ -183,10 +255,9 @@ class SDLWindow:
 						self.args = event.args
 					elif hasattr(event, "kwargs"):
 						OPTIONS.update(event.kwargs)
-						if "pixelmap" in kwargs:
-							self.draw_pixels()
-							offscreen_surf.fill(BACKGROUND)
-							self.update_offscreen()
+						if "pixelmap" in event.kwargs:
+							# a new pixelmap, or new arguments, might not raise the error again
+							self.failed.clear()
 					elif hasattr(event, "animate"):
 						delay = event.animate[0]
 						callback = event.animate[1]
@@ -199,8 +270,7 @@ class SDLWindow:
 				):
 					request_quit = True
 
-			if OPTIONS["on_update"] and not is_focused:
-				OPTIONS["on_update"]()
+			clock.update(is_focused)
 
 			if self.is_animation_running:
 				if animation_timer >= delay:
@@ -214,20 +284,10 @@ class SDLWindow:
 				else:
 					animation_timer += delta_time
 
-			if SYSTEM not in ("Windows", "Linux"):
-				if not self.queue.empty():
-					pixels = self.queue.get()
-
-					if offscreen_size != (pixels.shape[0], pixels.shape[1]):
-						offscreen_surf = pygame.Surface((pixels.shape[0], pixels.shape[1]))
-						offscreen_size = offscreen_surf.get_size()
-
-					pygame.surfarray.blit_array(offscreen_surf, pixels)
-					self.coords.pop(0)
-					self.is_processing = False
-
-			if request_quit and not self.is_processing:
+			if request_quit:
 				is_running = False
+				if self.batch:
+					self.batch.cancel()
 
 			# if keypress[K_w] or keypress[K_UP]:
 			# 	y0 += 5
@@ -246,44 +306,21 @@ class SDLWindow:
 				timer = 0
 				OPTIONS["position"] = x0, y0
 				OPTIONS["step"] = step = self.scale / self.spacing
-				if OPTIONS["pixelmap"] is not None and SYSTEM not in ("Windows", "Linux"):
-					self.screen.fill(BACKGROUND)
-					x1, y1, zoom2 = self.coords[0]
-					if len(self.coords) == 1 and not self.is_processing and (
-						zoom2 > 2
-						or zoom2 < 0.5
-						or not w/(2*zoom2) < x1 < pixels.shape[0] - w/(2*zoom2)
-						or not h/(2*zoom2) < y1 < pixels.shape[1] - h/(2*zoom2)
-					):
-						self.update_offscreen()
-
-					if 0 < x1 < offscreen_size[0] - w/zoom2 and 0 < y1 < offscreen_size[1] - h/zoom2:
-						s1 = offscreen_surf.subsurface((x1,y1),(w/zoom2, h/zoom2))
-						pygame.transform.scale(s1, (w,h), self.screen)
-					else:
-						self.screen.fill(BACKGROUND)
-
-				else:
-					self.screen.fill(BACKGROUND)
-
-				if OPTIONS["show_grid"]:
-					self.draw_grid()
-
-				for values in self.args:
-					self.draw_values(values)
-
-				if OPTIONS["show_range"]:
-					self.draw_range()
-				pygame.display.flip()
+				if self.batch:
+					self.batch.cancel()
+				self.draw_pixels()
 				did_change = False
-			elif OPTIONS["pixelmap"] and 0 <= timer < OPTIONS["timeout"]:
+			else:
 				timer += delta_time
 
-				if timer >= OPTIONS["timeout"]:
-					self.draw_pixels()
-
-			if not request_quit:
-				pygame.event.pump()
+			if OPTIONS["pixelmap"] is not None and is_running:
+				try:
+					if self.refine(timer >= OPTIONS["timeout"]):
+						self.draw_pixels()
+				except Exception as err:
+					self.failed.add(tiles.pixelmap_key(OPTIONS["pixelmap"]))
+					self.batch = None
+					print (err)
 
 		self.is_animation_running = False
 		win_w, win_h = Window.from_display_module().position
@@ -23,6 +23,7 @@ from OpenGL.GL import shaders
 from OpenGL.GLU import *
 from ..util import instanceof
 from .shader import Shader
+from .clock import FrameClock, FPS
 from pygame._sdl2.video import Window
 
 
@@ -32,9 +33,12 @@ OPTIONS = {
 	"on_update": None,
 	"on_close": None,
 	"show_grid": True,
+	"fps": FPS,
 }
 
 window = None
+MOVEMENT_KEYS = (K_w, K_UP, K_s, K_DOWN, K_d, K_RIGHT, K_a, K_LEFT)
+MAX_DELTA = 0.1 # seconds, movement speed is limited to this much time per frame after the loop wakes up
 
 class OpenGLWindow:
 	def __init__(self):
@@ -81,18 +85,22 @@ class OpenGLWindow:
 		self.is_running = True
 		is_focused = False
 		keypress = pygame.key.get_pressed()
+		clock = FrameClock(OPTIONS)
 
 		if OPTIONS["on_update"]:
 			OPTIONS["on_update"]()
 
 		while self.is_running:
+			is_moving = is_focused and any(keypress[i] for i in MOVEMENT_KEYS)
+			events = clock.events(did_change or self.is_animation_running or is_moving, is_focused)
+
 			tick = pygame.time.get_ticks()/1000
 			delta_time = tick - last_tick
 			last_tick = tick
-			speed = 10 * delta_time
+			speed = 10 * min(delta_time, MAX_DELTA)
 			camera_right = glm.normalize(glm.cross(self.camera_front, self.camera_up))
 
-			for event in pygame.event.get():
+			for event in events:
 				if event.type == MOUSEWHEEL:
 					delta = 1 + event.y/100
 					self.zoom *= delta
@@ -148,8 +156,7 @@ class OpenGLWindow:
 				else:
 					animation_timer += delta_time
 
-			if not is_focused and OPTIONS["on_update"]:
-				OPTIONS["on_update"]()
+			clock.update(is_focused)
 
 			keypress = pygame.key.get_pressed()
 			if is_focused:
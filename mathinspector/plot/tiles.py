@@ -0,0 +1,206 @@
+"""
+A cache of the pixels computed by pixelmaps, split into square tiles
+
+The plane is divided into tiles of TILE_SIZE x TILE_SIZE pixels at every zoom level, where the
+step between pixels at level n is 2**n.  The plot window draws each frame from the tiles at the
+level closest to the current step, scaling them to fit, and only calls the pixelmap for tiles
+which haven't been computed before.  Panning or zooming back to a region which was already
+visited doesn't compute anything.
+
+The missing tiles are computed in parallel by a pool of processes, which write the pixels
+directly into shared memory.  Each level is computed as a separate Batch, so the tiles which
+haven't started yet can be cancelled when the view changes.  The function which runs in the
+workers is in render.py, which doesn't import anything from the plot package.
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os, math, pickle, atexit, functools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, Future, wait
+from collections import OrderedDict
+from ..config import MULTIPROCESS_CONTEXT
+from ..render import TILE_SIZE, SLOT_BYTES, shared_memory, compute, render, slots
+
+CACHE_BYTES = 256 * 2**20 # the least recently used tiles are dropped when the cache grows larger than this
+WORKERS = os.cpu_count() or 1 # the number of processes in the pool
+
+class TileCache:
+	"""
+	A least recently used cache of tiles, limited by the total number of bytes in the tiles.
+	Tiles are stored under the key (pixelmap_key(pixelmap), level, tx, ty)
+	"""
+	def __init__(self, max_bytes=CACHE_BYTES):
+		self.max_bytes = max_bytes
+		self.nbytes = 0
+		self.tiles = OrderedDict()
+
+	def get(self, key):
+		if key not in self.tiles:
+			return None
+		self.tiles.move_to_end(key)
+		return self.tiles[key][0]
+
+	def put(self, key, tile, nbytes):
+		if key in self.tiles:
+			self.nbytes -= self.tiles.pop(key)[1]
+		self.tiles[key] = (tile, nbytes)
+		self.nbytes += nbytes
+		while self.nbytes > self.max_bytes and len(self.tiles) > 1:
+			self.nbytes -= self.tiles.popitem(last=False)[1][1]
+
+	def clear(self):
+		self.tiles.clear()
+		self.nbytes = 0
+
+	def __contains__(self, key):
+		return key in self.tiles
+
+	def __len__(self):
+		return len(self.tiles)
+
+
+def level(step):
+	""" the zoom level whose step is closest to `step` """
+	return round(math.log2(step))
+
+
+def visible(x0, y0, w, h, step, n):
+	"""
+	returns the (tx, ty) of every tile at level n which covers a screen of size (w, h) with the
+	origin at the screen coordinates (x0, y0)
+	"""
+	r = step / 2.0**n
+	tx0, tx1 = math.floor(-x0 * r / TILE_SIZE), math.floor((w - x0) * r / TILE_SIZE)
+	ty0, ty1 = math.floor(-y0 * r / TILE_SIZE), math.floor((h - y0) * r / TILE_SIZE)
+	return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+
+
+def pixelmap_key(pixelmap):
+	"""
+	identifies the pixels drawn by a pixelmap.  For a functools.partial, such as the pixelmaps
+	created by the node editor, the key is the function and its keyword arguments, so the tiles
+	computed earlier are used again when the arguments are changed back.  Pixelmaps with arguments
+	that can't be hashed, like arrays, are identified by the partial itself
+	"""
+	if isinstance(pixelmap, functools.partial):
+		key = (pixelmap.func, pixelmap.args, tuple(sorted(pixelmap.keywords.items())))
+		try:
+			hash(key)
+			return key
+		except TypeError:
+			pass
+	return pixelmap
+
+
+class TilePool:
+	"""
+	A persistent pool of processes which compute tiles in parallel.  Each worker writes the pixels
+	of its tile into a slot of a shared memory buffer, so the pixels are never pickled, and only
+	the pixelmap and the tile coordinates are sent to the workers
+	"""
+	def __init__(self, workers=WORKERS):
+		self.executor = ProcessPoolExecutor(workers, mp_context=mp.get_context(MULTIPROCESS_CONTEXT))
+		self.buffer = None
+		self.slots = None
+		self.futures = [] # the tiles of the last batch, which are cancelled on shutdown
+		atexit.register(self.shutdown)
+
+	def allocate(self, count):
+		""" makes sure the buffer has room for at least `count` tiles """
+		if self.slots is not None and len(self.slots) >= count:
+			return
+		self.release()
+		self.buffer = shared_memory.SharedMemory(create=True, size=count * SLOT_BYTES)
+		self.slots = slots(self.buffer)
+
+	def submit(self, key, pixelmap, n, tiles):
+		"""
+		starts computing every (tx, ty) in tiles at level n.  Only one batch can use the buffer at a
+		time, so the previous batch has to be done before the next one is submitted
+		"""
+		self.allocate(len(tiles))
+		self.futures = [self.executor.submit(render, self.buffer.name, i, pixelmap, n, tx, ty) for i, (tx, ty) in enumerate(tiles)]
+		return Batch(key, n, tiles, self.futures, self.slots)
+
+	def release(self):
+		if self.buffer is None: return
+		self.slots = None
+		self.buffer.close()
+		self.buffer.unlink()
+		self.buffer = None
+
+	def shutdown(self):
+		for future in self.futures:
+			future.cancel()
+		self.executor.shutdown(wait=False)
+		self.release()
+
+
+class Batch:
+	"""
+	The tiles of one level which are being computed.  When the batch is cancelled, the tiles which
+	haven't started yet are skipped, while the ones which finished are still added to the cache
+	"""
+	def __init__(self, key, n, tiles, futures, slots=None):
+		self.key = key
+		self.n = n
+		self.tiles = tiles
+		self.futures = futures
+		self.slots = slots
+
+	def done(self):
+		return all(i.done() for i in self.futures)
+
+	def wait(self):
+		wait(self.futures)
+
+	def cancel(self):
+		for i in self.futures:
+			i.cancel()
+
+	def results(self):
+		"""
+		yields (tx, ty), pixels for each finished tile.  With a shared buffer the pixels are a view
+		of the buffer, which is only valid until the next batch is submitted
+		"""
+		for i, future in enumerate(self.futures):
+			if future.cancelled(): continue
+			if self.slots is None:
+				yield self.tiles[i], future.result()
+			else:
+				tw, th = future.result()
+				yield self.tiles[i], self.slots[i, :tw, :th]
+
+
+def computed(key, pixelmap, n, tiles):
+	""" computes tiles in this process, and returns a Batch which is already done """
+	futures = []
+	for tx, ty in tiles:
+		futures.append(Future())
+		futures[-1].set_result(compute(pixelmap, n, tx, ty))
+	return Batch(key, n, tiles, futures)
+
+
+def picklable(pixelmap):
+	""" returns True when pixelmap can be sent to the worker processes """
+	if shared_memory is None:
+		return False
+	try:
+		pickle.dumps(pixelmap)
+		return True
+	except Exception as err:
+		return False
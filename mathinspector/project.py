@@ -498,6 +498,7 @@ class SaveData:
 
 			self.app.node.scale_font()
 			self.app.node.scale_width()
+			self.app.node.level_of_detail()
 
 		except Exception as err:
 			if self.app.debug:
@@ -0,0 +1,69 @@
+"""
+Computes the tiles of pixelmaps in the worker processes of the plot window
+
+With the spawn start method, every worker imports the module of the function it runs.  This
+module only depends on numpy, so the workers never import pygame, OpenGL or the rest of the
+plot package.  See plot/tiles.py for the cache and the pool which use it.
+"""
+"""
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import numpy as np
+
+try:
+	from multiprocessing import shared_memory
+except ImportError:
+	shared_memory = None # python 3.7 and older, the tiles are computed in the plot window's process
+
+TILE_SIZE = 256 # pixels along each side of a tile
+SLOT_BYTES = TILE_SIZE * TILE_SIZE * 3 # the size of an rgb tile in the shared memory buffer
+
+def compute(pixelmap, n, tx, ty):
+	"""
+	calls pixelmap for the tile (tx, ty) at level n.  The top left corner of the tile is the point
+	(tx, -ty) * TILE_SIZE * 2**n, so ty increases downwards like screen coordinates
+	"""
+	s = 2.0**n
+	size = TILE_SIZE * s
+	pixels = pixelmap(((tx + 0.5) * size, -(ty + 0.5) * size), (size, size), s)
+	return pixels[:TILE_SIZE, :TILE_SIZE]
+
+
+def slots(buffer):
+	""" the tiles stored in a shared memory buffer, as an array of shape (count, TILE_SIZE, TILE_SIZE, 3) """
+	return np.ndarray((buffer.size // SLOT_BYTES, TILE_SIZE, TILE_SIZE, 3), dtype=np.uint8, buffer=buffer.buf)
+
+
+attached = {} # the shared memory buffers opened by a worker process, by name
+
+def render(name, index, pixelmap, n, tx, ty):
+	"""
+	runs in a worker process, computes the tile (tx, ty) and copies it into slot `index` of the
+	shared buffer `name`.  Returns the width and height of the tile
+	"""
+	if name not in attached:
+		for buffer in attached.values():
+			buffer.close()
+		attached.clear()
+		attached[name] = shared_memory.SharedMemory(name=name)
+
+	pixels = compute(pixelmap, n, tx, ty)
+	if np.ndim(pixels) != 3 or np.shape(pixels)[2] != 3:
+		raise ValueError("only rgb pixelmaps can be computed in the pool")
+
+	tw, th = pixels.shape[:2]
+	slots(attached[name])[index, :tw, :th] = np.clip(pixels, 0, 255)
+	return tw, th
@@ -81,6 +81,16 @@ TAGS = {
     "error_file_hover": {
         "foreground": Color.WHITE
     },
+
+    "elided": {
+        "foreground": Color.BLUE,
+        "font": FONT + " italic"
+    },
+
+    "elided_hover": {
+        "foreground": Color.WHITE,
+        "font": FONT + " italic"
+    },
 }
 
 TREE_TAGS = {
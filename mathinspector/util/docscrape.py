@@ -5,7 +5,7 @@ import textwrap
 import re
 import pydoc
 from warnings import warn
-import collections
+import collections.abc
 import copy
 import sys
 
@@ -95,7 +95,7 @@ class ParseError(Exception):
         return message
 
 
-class NumpyDocString(collections.Mapping):
+class NumpyDocString(collections.abc.Mapping):
 
 
     sections = {
@@ -578,7 +578,7 @@ class ClassDoc(NumpyDocString):
         return [name for name, func in inspect.getmembers(self._cls)
                 if ((not name.startswith('_')
                      or name in self.extra_public_methods)
-                    and isinstance(func, collections.Callable)
+                    and isinstance(func, collections.abc.Callable)
                     and self._is_show_member(name))]
 
     @property
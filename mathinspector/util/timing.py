@@ -0,0 +1,108 @@
+"""
+Math Inspector: a visual programming environment for scientific computing
+Copyright (C) 2021 Matt Calhoun
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import timeit as _timeit, pstats, statistics, os
+
+MAX_REPEAT = 7
+TIME_BUDGET = 2 # seconds, the number of repeats is reduced for slow statements to stay under this
+COLUMNS = ("ncalls", "tottime", "percall", "cumtime", "function")
+
+def timeit(stmt, globals=None):
+	"""
+	times stmt, which is either a string or a callable.  The number of loops is chosen so
+	that each run takes at least 0.2 seconds, and the number of runs so that timing doesn't
+	take much longer than TIME_BUDGET
+	"""
+	timer = _timeit.Timer(stmt, globals=globals)
+	number, elapsed = timer.autorange()
+	repeat = max(1, min(MAX_REPEAT, int(TIME_BUDGET / max(elapsed, 1e-9))))
+	times = [elapsed] + timer.repeat(repeat - 1, number)
+	return TimeitResult([t / number for t in times], number)
+
+
+class TimeitResult:
+	def __init__(self, times, number):
+		self.times = times
+		self.number = number
+		self.mean = statistics.mean(times)
+		self.stdev = statistics.stdev(times) if len(times) > 1 else 0
+		self.min = min(times)
+
+	def __repr__(self):
+		return (format_time(self.mean) + " ± " + format_time(self.stdev) + " per loop, min " + format_time(self.min)
+			+ " (mean ± std. dev. of " + str(len(self.times)) + " runs, " + str(self.number) + " loops each)")
+
+
+def format_time(seconds):
+	for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+		if seconds >= scale:
+			return "{:.3g} ".format(seconds / scale) + unit
+	return "{:.3g} ns".format(seconds / 1e-9)
+
+
+class ProfileStats:
+	"""
+	The result of running code under cProfile, which is displayed as a table in the doc browser.
+	Click on a column name to sort by it, and on a function to see its callers and callees
+	"""
+	def __init__(self, profiler, name):
+		self.__name__ = name
+		self.stats = pstats.Stats(profiler)
+		self.stats.calc_callees()
+		self.sort = "cumtime"
+		self.selected = None
+
+	def rows(self, sort=None):
+		""" returns a list of (function, (primitive calls, ncalls, tottime, cumtime)) sorted by `sort` """
+		sort = sort or self.sort
+		rows = [(fn, self.stats.stats[fn][:4]) for fn in self.stats.stats]
+		if sort == "function":
+			return sorted(rows, key=lambda row: label(row[0]))
+		key = {
+			"ncalls": lambda row: row[1][1],
+			"tottime": lambda row: row[1][2],
+			"percall": lambda row: row[1][2] / max(row[1][1], 1),
+			"cumtime": lambda row: row[1][3]
+		}[sort]
+		return sorted(rows, key=key, reverse=True)
+
+	def callers(self, fn):
+		return self.stats.stats[fn][4]
+
+	def callees(self, fn):
+		return self.stats.all_callees[fn] if fn in self.stats.all_callees else {}
+
+	def table(self, limit=None):
+		return "\n".join(format_row(fn, values) for fn, values in self.rows()[:limit])
+
+	def __repr__(self):
+		return ("{} function calls in {:.3f} seconds\n\n".format(self.stats.total_calls, self.stats.total_tt)
+			+ "\t".join(COLUMNS) + "\n" + self.table(10))
+
+
+def label(fn):
+	""" the name of a function in the profile, as file:line(name) """
+	file, line, name = fn
+	if file == "~":
+		return name
+	return os.path.basename(file) + ":" + str(line) + "(" + name + ")"
+
+
+def format_row(fn, values):
+	cc, nc, tt, ct = values[:4]
+	ncalls = str(nc) if cc == nc else str(nc) + "/" + str(cc)
+	return "\t".join((ncalls, "{:.4f}".format(tt), "{:.4f}".format(tt / max(nc, 1)), "{:.4f}".format(ct), label(fn)))
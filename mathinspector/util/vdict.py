@@ -22,8 +22,8 @@ class vdict(dict): # need to extend dict so it can be passed as an argument to e
 	"""
 	vdict: a dictionary class that has callbacks for get, set, and del events
 	"""
-	def __init__(self, *args, getitem=None, setitem=None, delitem=None, **kwargs):
-		self.store = OrderedDict()
+	def __init__(self, *args, getitem=None, setitem=None, delitem=None, journal=False, **kwargs):
+		self.store = Journal() if journal else OrderedDict()
 		self.store.update(dict(*args, **kwargs))
 		self._get = getitem
 		self._del = delitem
@@ -70,4 +70,55 @@ class vdict(dict): # need to extend dict so it can be passed as an argument to e
 		return len(self.store)
 
 	def __repr__(self):
-		return repr(list(self.store))
\ No newline at end of file
+		return repr(list(self.store))
+
+class Journal(OrderedDict):
+	"""
+	An OrderedDict which records the version at which each key was last set or deleted, so
+	copies of it can be kept up to date by only applying the keys which changed
+
+	>>> keys = app.objects.store.changed(version)
+	>>> version = app.objects.store.version
+	"""
+	def __init__(self, *args, **kwargs):
+		self.version = 0
+		self.changes = OrderedDict() # key -> version, from the oldest change to the newest
+		OrderedDict.__init__(self, *args, **kwargs)
+
+	def touch(self, key):
+		self.version += 1
+		self.changes[key] = self.version
+		self.changes.move_to_end(key)
+
+	def changed(self, version):
+		""" returns the keys which have been set or deleted since version, oldest first """
+		result = []
+		for key in reversed(self.changes):
+			if self.changes[key] <= version:
+				break
+			result.append(key)
+		return result[::-1]
+
+	def __setitem__(self, key, value):
+		OrderedDict.__setitem__(self, key, value)
+		self.touch(key)
+
+	def __delitem__(self, key):
+		OrderedDict.__delitem__(self, key)
+		self.touch(key)
+
+	def pop(self, key, *default):
+		if key in self:
+			self.touch(key)
+		return OrderedDict.pop(self, key, *default)
+
+	def popitem(self, last=True):
+		key, value = OrderedDict.popitem(self, last)
+		self.touch(key)
+		return key, value
+
+	def clear(self):
+		keys = list(self)
+		OrderedDict.clear(self)
+		for key in keys:
+			self.touch(key)
@@ -23,7 +23,8 @@ from ..config import is_modifier_key_pressed, BUTTON_RIGHT
 from ..util import BUILTIN_FUNCTION, BUILTIN_CLASS
 from ..widget.menu import Menu
 from ..console.builtin_print import builtin_print
-import io, re, tokenize, keyword, builtins, inspect
+import io, re, tokenize, keyword, builtins, inspect, bisect
+from collections import OrderedDict
 
 RE_PY = {
 
@@ -36,6 +37,9 @@ RE_PY = {
 	"console_prompt": r"((>>>|\.\.\.))"
 }
 
+TOKEN_CACHE_SIZE = 20000 # the number of lines whose tokens are remembered by lex
+token_cache = OrderedDict() # (line, state) -> (spans, state)
+
 # REFACTOR - this is a good pattern, move this into style
 DEFAULT_OPTS = {
 	"foreground": Color.WHITE,
@@ -54,6 +58,88 @@ DEFAULT_OPTS = {
 }
 
 
+def indices(start, content):
+	""" returns a function which converts offsets in content, which begins at the index start, into text indices """
+	line, col = map(int, start.split("."))
+	newlines = [match.start() for match in re.finditer("\n", content)]
+	def index(offset):
+		n = bisect.bisect_left(newlines, offset)
+		return str(line + n) + "." + str(offset + col if n == 0 else offset - newlines[n - 1] - 1)
+	return index
+
+
+def lex(line, state=None):
+	"""
+	returns a list of (tag, start column, end column) for a single line of python, and the quotes
+	of a triple quoted string which is still open at the end of the line.  `state` is the
+	open quotes from the previous line.
+	"""
+	key = line, state
+	if key in token_cache:
+		token_cache.move_to_end(key)
+		return token_cache[key]
+
+	spans, offset = [], 0
+	if state:
+		end = line.find(state)
+		if end == -1:
+			return cache_tokens(key, [("yellow", 0, len(line))], state)
+		spans.append(("yellow", 0, end + 3))
+		offset = end + 3
+
+	rest, state = line[offset:], None
+	for tag in RE_PY:
+		for match in re.finditer(RE_PY[tag], rest):
+			if match.start(2) != -1:
+				spans.append((tag, offset + match.start(2), offset + match.end(2)))
+
+	try:
+		for typ, string, start, end, _ in tokenize.generate_tokens(io.StringIO(rest).readline):
+			tag = token_tag(tokenize.tok_name[typ], string)
+			if tag:
+				spans.append((tag, offset + start[1], offset + end[1]))
+	except (tokenize.TokenError, SyntaxError) as err:
+		# a triple quoted string which continues onto the next line
+		col = err.args[1][1] if len(err.args) > 1 and isinstance(err.args[1], tuple) else -1
+		match = re.match(r"[rRbBuUfF]*(\"\"\"|\'\'\')", rest[col:]) if col >= 0 else None
+		if match:
+			spans.append(("yellow", offset + col, len(line)))
+			state = match.group(1)
+	except Exception as err:
+		pass
+
+	return cache_tokens(key, spans, state)
+
+
+def cache_tokens(key, spans, state):
+	token_cache[key] = spans, state
+	if len(token_cache) > TOKEN_CACHE_SIZE:
+		token_cache.popitem(last=False)
+	return spans, state
+
+
+def token_tag(token, string):
+	if token == "NAME":
+		if string in ["def", "clear", "app", "help", "plot", "class"]:
+			return "blue_italic"
+		elif string in keyword.kwlist:
+			return "red"
+		elif string in BUILTIN_FUNCTION:
+			return "blue"
+		elif string in BUILTIN_CLASS:
+			return "blue_italic"
+	elif token == "OP":
+		if string in ["=", "*", "**"]:
+			return "red"
+	elif token == "STRING":
+		return "yellow"
+	elif token == "NUMBER":
+		return "purple"
+	elif token == "COMMENT":
+		return "comment"
+	return None
+
+
 class Text(tk.Text):
 	def __init__(self, parent, *args, readonly=False, has_scrollbar=False, **kwargs):
 		opts = DEFAULT_OPTS.copy()
@@ -118,48 +204,39 @@ class Text(tk.Text):
 
 
 	def highlight(self, pattern, tag, start="1.0", end="end"):
-		for match in re.compile(pattern, re.MULTILINE).finditer(self.get(start, end)):
-			ind1 = self.index(self.index(start) + "+" + str(match.start(2)) + "c")
-			ind2 = self.index(self.index(start) + "+" + str(match.end(2)) + "c")
-			self.tag_add(tag, ind1, ind2)
+		start = self.index(start)
+		content = self.get(start, end)
+		index = indices(start, content)
+		ranges = []
+		for match in re.compile(pattern, re.MULTILINE).finditer(content):
+			if match.start(2) != -1:
+				ranges.extend((index(match.start(2)), index(match.end(2))))
+		if ranges:
+			self.tag_add(tag, *ranges)
 
 	def syntax_highlight(self, start="1.0", end="end"):
+		"""
+		each line is tokenized on its own by `lex`, which remembers the tokens of every line it
+		has seen, so only lines which have changed are tokenized again.  The tags are added
+		with a single call to tag_add for each tag
+		"""
+		start = self.index(start)
 		for i in TAGS:
 			self.tag_remove(i, start, end)
 
 		content = self.get(start, end)
 		if not content: return
 
-		try:
-			for i in RE_PY:
-				self.highlight(RE_PY[i], i, start, self.index(end))
-
-			for typ, string, start_index, end_index, line in tokenize.generate_tokens(io.StringIO(content).readline):
-				token = tokenize.tok_name[typ]
-
-				ind1 = self.index(self.index(start) + "+" + str(start_index[0] - 1) + "l" + "+" + str(start_index[1]) + "c")
-				ind2 = self.index(self.index(start) + "+" + str(end_index[0] - 1) + "l" + "+" + str(end_index[1]) + "c")
-
-				if token == "NAME":
-					if string in ["def", "clear", "app", "help", "plot", "class"]:
-						self.tag_add("blue_italic", ind1, ind2)
-					elif string in keyword.kwlist:
-						self.tag_add("red", ind1, ind2)
-					elif string in BUILTIN_FUNCTION:
-						self.tag_add("blue", ind1, ind2)
-					elif string in BUILTIN_CLASS:
-						self.tag_add("blue_italic", ind1, ind2)
-				elif token == "OP":
-					if string in ["=", "*", "**"]:
-						self.tag_add("red", ind1, ind2)
-				elif token == "STRING":
-					self.tag_add("yellow", ind1, ind2)
-				elif token == "NUMBER":
-					self.tag_add("purple", ind1, ind2)
-				elif token == "COMMENT":
-					self.tag_add("comment", ind1, ind2)
-		except Exception as err:
-			pass
+		line, col = map(int, start.split("."))
+		ranges, state = {}, None
+		for i, text in enumerate(content.split("\n")):
+			spans, state = lex(text, state)
+			offset = col if i == 0 else 0
+			for tag, a, b in spans:
+				ranges.setdefault(tag, []).extend((str(line + i) + "." + str(offset + a), str(line + i) + "." + str(offset + b)))
+
+		for tag in ranges:
+			self.tag_add(tag, *ranges[tag])
 
 	def remove_selection(self):
 		tag_ranges = self.tag_ranges("sel")
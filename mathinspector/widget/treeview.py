@@ -22,7 +22,19 @@ from os.path import basename
 from .menu import Menu
 from .text import Text
 
+PAGE_SIZE = 200 # the number of rows inserted at a time by Treeview.insert_rows
+
 class Treeview(ttk.Treeview):
+	"""
+	Rows can be populated lazily, so that only the rows which have been expanded are ever
+	inserted into the tree.  Call `lazy(key, populate)` and populate(key) is called the
+	first time the row `key` is opened
+
+	>>> app.modules.lazy(folder, lambda key: app.modules.insert_rows(key, rows))
+
+	Long lists of rows are inserted PAGE_SIZE rows at a time by `insert_rows`, followed
+	by a row which inserts the next page when it is expanded
+	"""
 	def __init__(self, app, *args, drag=True, **kwargs):
 		if not args:
 			args = [app]
@@ -32,7 +44,9 @@ class Treeview(ttk.Treeview):
 		self.app = app
 		self.menu = Menu(app)
 		self.hover_item = None
+		self.populators = {} # key -> (placeholder, populate) for rows which haven't been opened yet
 
+		self.bind('<<TreeviewOpen>>', self._on_treeview_open)
 		self.bind('<Motion>', self._on_motion)
 		self.bind('<Leave>', self._on_leave)
 		self.tag_configure("hover", background=Color.HIGHLIGHT_INACTIVE)
@@ -76,6 +90,47 @@ class Treeview(ttk.Treeview):
 				del tags[tags.index(t)]
 		self.item(item, tags=tags)
 
+	def lazy(self, key, populate):
+		""" inserts a placeholder row, so that key can be expanded before it has any children """
+		placeholder = self.insert(key, "end", text="", tags=("placeholder", "no_hover"))
+		self.populators[key] = placeholder, populate
+
+	def populate(self, key):
+		""" calls the populate function of key if it hasn't been opened yet """
+		if key not in self.populators: return
+		placeholder, populate = self.populators.pop(key)
+		if self.exists(placeholder):
+			ttk.Treeview.delete(self, placeholder)
+			populate(key)
+
+	def delete(self, *keys):
+		""" deletes keys and their descendants, along with the populate functions of the ones which were never opened """
+		ttk.Treeview.delete(self, *keys)
+		for key in [i for i in self.populators if not self.exists(i)]:
+			del self.populators[key]
+
+	def expand(self, key):
+		self.populate(key)
+		self.item(key, open=True)
+
+	def insert_rows(self, parent, rows, insert=None):
+		"""
+		inserts the first PAGE_SIZE of rows into parent, where each row is a dict of the
+		keyword arguments of insert.  The rest of the rows are inserted when the last row
+		is expanded
+		"""
+		insert = insert or self.insert
+		for row in rows[:PAGE_SIZE]:
+			insert(parent, "end", **row)
+
+		if len(rows) > PAGE_SIZE:
+			more = self.insert(parent, "end", text="... " + str(len(rows) - PAGE_SIZE) + " more", tags="more")
+			def populate(key):
+				self.insert_rows(parent, rows[PAGE_SIZE:], insert)
+				# tk opens the row after <<TreeviewOpen>>, so it can't be deleted until then
+				self.after_idle(lambda: self.exists(key) and ttk.Treeview.delete(self, key))
+			self.lazy(more, populate)
+
 	def order(self, items=None):
 		if not items: return [{
 			"key": i,
@@ -113,9 +168,12 @@ class Treeview(ttk.Treeview):
 			for j in children:
 				item = self.item(j)
 				if item["text"] == i["name"]:
-					self.item(j, open=True)
+					self.expand(j)
 					self.expanded(i["children"], self.get_children(j))
 
+	def _on_treeview_open(self, event):
+		self.populate(self.focus())
+
 	def _on_motion(self, event):
 		item = self.identify_row(event.y)
 		if not item or self.has_tag(item, "no_hover"): return
@@ -0,0 +1,3 @@
+# the console has to be imported before the node editor, in the same order as app.py, because
+# of the circular imports between the console, the widgets and the node editor
+import mathinspector.console
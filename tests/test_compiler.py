@@ -0,0 +1,80 @@
+import operator
+import numpy as np
+import pytest
+from mathinspector.node.compiler import compile_graph, identifier, upstream
+
+
+class Params:
+	""" the args or kwargs of an item, store holds the values and ["connection"] the items plugged in """
+	def __init__(self, store):
+		self.store = store
+
+	def __getitem__(self, key):
+		assert key == "connection"
+		return { k: v for k, v in self.store.items() if isinstance(v, Item) }
+
+
+class Item:
+	def __init__(self, name, obj, args=None, kwargs=None):
+		self.name = name
+		self.obj = obj
+		self.is_callable = callable(obj)
+		self.args = Params(args if args is not None else ({} if self.is_callable else { "<value>": obj }))
+		self.kwargs = Params(kwargs or {})
+
+
+def graph(*items):
+	return { i.name: i for i in items }
+
+
+def test_connected_functions_are_called_in_order():
+	x = Item("x", 2)
+	add = Item("add", operator.add, { "a": x, "b": 1 })
+	mul = Item("mul", operator.mul, { "a": add, "b": 3 })
+	assert [i.name for i in upstream(mul)] == ["x", "add", "mul"]
+
+	fn = compile_graph(graph(x, add, mul), "mul")
+	assert fn() == 9
+	assert fn(x=4, add_b=0, mul_b=2) == 8
+	assert "def mul(" in fn.source
+
+
+def test_empty_arguments_become_required_parameters():
+	add = Item("add", operator.add, { "a": None, "b": 1 })
+	fn = compile_graph(graph(add), "add")
+	assert fn(5) == 6
+	with pytest.raises(TypeError):
+		fn()
+
+
+def test_kwargs_which_are_none_are_left_out():
+	r = Item("r", round, { "number": 1.26 }, { "ndigits": None })
+	assert compile_graph(graph(r), "r")() == 1
+	r = Item("r", round, { "number": 1.26 }, { "ndigits": 1 })
+	assert compile_graph(graph(r), "r")() == 1.3
+
+
+def test_values_plugged_into_values_are_cast():
+	x = Item("x", 2.7)
+	n = Item("n", 0, { "<value>": x })
+	assert compile_graph(graph(x, n), "n")() == 2
+
+	a = Item("a", np.zeros(3))
+	b = Item("b", np.arange(2), { "<value>": a })
+	assert compile_graph(graph(a, b), "b")().shape == (3,)
+
+
+def test_exceptions_are_not_caught():
+	div = Item("div", operator.truediv, { "a": 1, "b": 0 })
+	with pytest.raises(ZeroDivisionError):
+		compile_graph(graph(div), "div")()
+
+
+def test_names_which_are_not_identifiers():
+	v0 = Item("v0", 1)
+	cls = Item("class", operator.neg, { "a": v0 })
+	fn = compile_graph(graph(v0, cls), "class")
+	assert fn() == -1
+	assert fn(_v0=2) == -2
+	assert identifier("1x", set()) == "_1x"
+	assert identifier("a-b", { "a_b" }) == "a_b_1"
@@ -0,0 +1,103 @@
+import operator, pickle
+import numpy as np
+import pytest
+from mathinspector.headless import Graph, run
+
+
+def save(path, objects, itemdata):
+	""" writes a project file with the same structure as SaveData.savedata """
+	with open(path, "wb") as f:
+		pickle.dump([{ "name": "objects", "value": objects }, { "name": "itemdata", "value": itemdata }], f)
+	return str(path)
+
+
+def item(args=None, kwargs=None, connection=None):
+	return { "args": args or {}, "kwargs": kwargs or {}, "connection": connection }
+
+
+@pytest.fixture
+def project(tmp_path):
+	# x -> add.a, add -> mul.a, y = mul(add(x, 1), 3)
+	return save(tmp_path / "project.math", {
+		"x": 2,
+		"add": operator.add,
+		"mul": operator.mul,
+	}, {
+		"x": item({ "<value>": 2 }, connection=("add", "a")),
+		"add": item({ "a": None, "b": 1 }, connection=("mul", "a")),
+		"mul": item({ "a": None, "b": 3 }),
+	})
+
+
+def test_value_evaluates_everything_plugged_in(project):
+	graph = Graph(project)
+	assert graph.outputs() == ["mul"]
+	assert graph.value("mul") == 9
+	assert graph.value("add") == 3
+
+
+def test_missing_argument_evaluates_to_the_function(tmp_path):
+	graph = Graph(save(tmp_path / "p.math", { "add": operator.add }, { "add": item({ "a": None, "b": 1 }) }))
+	assert graph.value("add") is operator.add
+
+
+def test_exception_evaluates_to_the_function(tmp_path, capsys):
+	graph = Graph(save(tmp_path / "p.math", { "add": operator.add }, { "add": item({ "a": "s", "b": 1 }) }))
+	assert graph.value("add") is operator.add
+	assert "TypeError" in capsys.readouterr().err
+
+
+def test_none_kwargs_are_left_out(tmp_path):
+	graph = Graph(save(tmp_path / "p.math", { "round": round }, { "round": item({ "number": 1.26 }, { "ndigits": None }) }))
+	assert graph.value("round") == 1
+	graph = Graph(save(tmp_path / "q.math", { "round": round }, { "round": item({ "number": 1.26 }, { "ndigits": 1 }) }))
+	assert graph.value("round") == 1.3
+
+
+def test_value_plugged_into_a_value_is_cast(tmp_path):
+	graph = Graph(save(tmp_path / "p.math", { "x": 2.7, "n": 0 }, {
+		"x": item(connection=("n", "<value>")),
+		"n": item(),
+	}))
+	assert graph.value("n") == 2 and isinstance(graph.value("n"), int)
+
+
+def test_unknown_item_and_cycles_raise(tmp_path):
+	graph = Graph(save(tmp_path / "p.math", { "f": abs, "g": abs }, {
+		"f": item({ "x": None }, connection=("g", "x")),
+		"g": item({ "x": None }, connection=("f", "x")),
+	}))
+	with pytest.raises(Exception, match="no item named"):
+		graph.value("h")
+	with pytest.raises(Exception, match="cycle"):
+		graph.value("f")
+
+
+def test_run_prints_the_outputs(project, capsys):
+	assert run(project) == 0
+	assert capsys.readouterr().out.strip() == "mul = 9"
+
+
+def test_run_saves_npz_and_pickles(project, tmp_path):
+	assert run(project, output="add,mul", save=str(tmp_path / "out.npz")) == 0
+	data = np.load(tmp_path / "out.npz")
+	assert data["add"] == 3 and data["mul"] == 9
+
+	assert run(project, output="mul", save=str(tmp_path / "out.pkl")) == 0
+	with open(tmp_path / "out.pkl", "rb") as f:
+		assert pickle.load(f) == { "mul": 9 }
+
+
+def test_run_accepts_a_project_folder(tmp_path, capsys):
+	folder = tmp_path / "demo"
+	folder.mkdir()
+	save(folder / "demo.math", { "x": 5 }, { "x": item() })
+	assert run(str(folder)) == 0
+	assert capsys.readouterr().out.strip() == "x = 5"
+
+
+def test_run_reports_missing_files_and_items(project, tmp_path, capsys):
+	assert run(str(tmp_path / "missing.math")) == 1
+	assert "is not a file" in capsys.readouterr().err
+	assert run(project, output="nothing") == 1
+	assert "no item named" in capsys.readouterr().err
@@ -0,0 +1,44 @@
+from mathinspector.widget import text
+from mathinspector.widget.text import lex
+
+
+def tags(line, state=None):
+	spans, state = lex(line, state)
+	return {line[start:end]: tag for tag, start, end in spans}, state
+
+
+def test_keywords_builtins_and_strings():
+	found, state = tags("def f(x): return len('abc')")
+	assert state is None
+	assert found["def"] == "blue_italic"
+	assert found["return"] == "red"
+	assert found["len"] == "blue"
+	assert found["'abc'"] == "yellow"
+
+
+def test_triple_quoted_strings_continue_onto_the_next_line():
+	spans, state = lex('x = """start')
+	assert state == '"""'
+	assert ("yellow", 4, 12) in spans
+
+	spans, state = lex("still inside", state)
+	assert spans == [("yellow", 0, 12)] and state == '"""'
+
+	spans, state = lex('end""" + 1', state)
+	assert state is None
+	assert spans[0] == ("yellow", 0, 6)
+
+	assert lex("s = r'''raw")[1] == "'''"
+
+
+def test_tokens_are_cached():
+	text.token_cache.clear()
+	first, _ = lex("x = 1")
+	assert lex("x = 1")[0] is first
+	assert lex("x = 1", '"""')[0] is not first
+	assert len(text.token_cache) == 2
+
+	for i in range(text.TOKEN_CACHE_SIZE + 1):
+		lex("y = " + str(i))
+	assert len(text.token_cache) == text.TOKEN_CACHE_SIZE
+	assert ("x = 1", None) not in text.token_cache
@@ -0,0 +1,77 @@
+from mathinspector.node.spatial import SpatialIndex, CELL_SIZE
+
+
+class Canvas:
+	zoom = 1
+
+
+def index():
+	return SpatialIndex(Canvas())
+
+
+def test_find_and_nearest():
+	spatial = index()
+	spatial.insert(1, (0, 0, 10, 10), "a", "input", "x")
+	spatial.insert(2, (100, 0, 110, 10), "a", "output")
+	spatial.insert(3, (0, 0, 200, 100), "b", "parent")
+
+	assert spatial.find(5, 5, role="input") == (1, ("a", "input", "x"))
+	assert spatial.find(50, 50) == (3, ("b", "parent", None))
+	assert spatial.find(300, 300) is None
+
+	assert spatial.nearest(20, 5, 20)[0] == 1
+	assert spatial.nearest(95, 5, 20, role="output")[0] == 2
+	assert spatial.nearest(50, 5, 10, role="input") is None
+
+
+def test_boxes_spanning_many_cells():
+	spatial = index()
+	spatial.insert(1, (-CELL_SIZE, -CELL_SIZE, 2*CELL_SIZE, CELL_SIZE), "a", "parent")
+	assert len(spatial.cells) == 12
+	assert spatial.query(2*CELL_SIZE - 1, 0, 2*CELL_SIZE - 1, 0) == {1}
+	spatial.remove(1)
+	assert spatial.cells == {} and spatial.owners == {} and spatial.entries == {}
+
+
+def test_insert_replaces_an_existing_key():
+	spatial = index()
+	spatial.insert(1, (0, 0, 10, 10), "a", "input")
+	spatial.insert(1, (500, 500, 510, 510), "a", "input")
+	assert spatial.find(5, 5) is None
+	assert spatial.find(505, 505)[0] == 1
+	assert len(spatial.cells) == 1
+
+
+def test_remove_and_move_item():
+	spatial = index()
+	spatial.insert(1, (0, 0, 10, 10), "a", "input")
+	spatial.insert(2, (20, 0, 30, 10), "a", "output")
+	spatial.insert(3, (0, 0, 10, 10), "b", "input")
+
+	spatial.move_item("a", 100, 50)
+	assert spatial.bbox(1) == (100, 50, 110, 60)
+	assert spatial.bbox(2) == (120, 50, 130, 60)
+	assert spatial.bbox(3) == (0, 0, 10, 10)
+
+	spatial.remove_item("a")
+	assert set(spatial.entries) == {3} and set(spatial.owners) == {"b"}
+
+
+def test_pan_and_zoom():
+	spatial = index()
+	spatial.insert(1, (10, 10, 20, 20), "a", "input")
+
+	spatial.pan(100, 50)
+	assert spatial.bbox(1) == (110, 60, 120, 70)
+	assert spatial.find(115, 65)[0] == 1 and spatial.find(15, 15) is None
+
+	spatial.scale(110, 60, 2)
+	spatial.canvas.zoom = 2
+	assert spatial.bbox(1) == (110, 60, 130, 80)
+	assert spatial.find(125, 75)[0] == 1
+
+	# boxes inserted while zoomed in are stored in the same world coordinates
+	spatial.insert(2, (110, 60, 130, 80), "b", "input")
+	assert spatial.entries[2][0] == spatial.entries[1][0]
+	spatial.move_item("b", 20, 0)
+	assert spatial.bbox(2) == (130, 60, 150, 80)
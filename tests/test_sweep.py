@@ -0,0 +1,104 @@
+import math
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from mathinspector.node.sweep import Sweep
+
+
+class Params(dict):
+	@property
+	def store(self):
+		return self
+
+
+class Item:
+	def __init__(self, obj, args=None, kwargs=None):
+		self.name = getattr(obj, "__name__", "fn")
+		self.obj = obj
+		self.args = Params(args or {})
+		self.kwargs = Params(kwargs or {})
+
+
+class Counted:
+	""" counts the calls to fn, and how many of them were made with arrays """
+	def __init__(self, fn):
+		self.fn = fn
+		self.calls = self.array_calls = 0
+
+	def __call__(self, x, *args, **kwargs):
+		self.calls += 1
+		self.array_calls += np.ndim(x) > 0
+		return self.fn(x, *args, **kwargs)
+
+
+@pytest.fixture
+def executor():
+	with ThreadPoolExecutor(2) as executor:
+		yield executor
+
+
+def test_broadcasting_functions_are_called_once_with_every_value(executor):
+	fn = Counted(np.sin)
+	values = np.linspace(0, 1, 50)
+	sweep = Sweep(Item(fn, { "x": None }), "x", values, executor)
+	assert np.allclose(sweep.results, np.sin(values))
+	assert fn.array_calls == 1
+	assert fn.calls == 4 # the first, middle and last values are checked on their own
+
+
+def test_broadcast_rows_have_the_shape_of_a_single_result(executor):
+	x = np.linspace(0, 1, 5)
+	sweep = Sweep(Item(lambda x, a: a * x, { "x": x, "a": None }), "a", [1, 2, 3], executor)
+	assert sweep.results.shape == (3, 5)
+	assert np.allclose(sweep.results[2], 3 * x)
+
+
+def test_functions_which_dont_accept_arrays_use_the_executor(executor):
+	values = np.linspace(0, 1, 20)
+	sweep = Sweep(Item(math.sin, { "x": None }), "x", values, executor)
+	assert np.allclose(sweep.results, np.sin(values))
+
+
+def test_results_which_dont_match_single_calls_are_not_used():
+	# on an array this subtracts the mean of every value, but on a single value it's always 0
+	fn = Counted(lambda x: x - np.mean(x))
+	sweep = Sweep(Item(fn, { "x": None }), "x", np.arange(10.0))
+	assert np.allclose(sweep.results, 0)
+	assert fn.calls == 11
+
+
+def test_results_with_the_wrong_shape_are_not_used():
+	# np.sum reduces the whole column, so the broadcast result isn't one row per value
+	sweep = Sweep(Item(np.sum, { "a": None }), "a", np.arange(4.0))
+	assert np.allclose(sweep.results, np.arange(4.0))
+
+
+def test_kwargs_can_be_swept():
+	sweep = Sweep(Item(round, { "number": 1.23456 }, { "ndigits": None }), "ndigits", [0, 1, 2])
+	assert list(sweep.results) == [1, 1.2, 1.23]
+
+
+def test_results_which_cant_be_stacked_are_kept_in_an_object_array():
+	sweep = Sweep(Item(lambda n: list(range(n)), { "n": None }), "n", [1, 2, 3])
+	assert sweep.results.dtype == object
+	assert sweep.results[2] == [0, 1, 2]
+
+
+def test_a_single_value():
+	sweep = Sweep(Item(math.sqrt, { "x": None }), "x", [4.0])
+	assert list(sweep.results) == [2.0]
+	assert len(sweep) == 1
+
+
+def test_empty_values_raise():
+	with pytest.raises(ValueError):
+		Sweep(Item(math.sqrt, { "x": None }), "x", [])
+	with pytest.raises(ValueError):
+		Sweep(Item(math.sqrt, { "x": None }), "x", 4.0)
+
+
+def test_data_pairs_results_with_the_first_argument():
+	x = np.linspace(0, 1, 5)
+	sweep = Sweep(Item(lambda x, a: a * x, { "x": x, "a": None }), "a", [1, 2])
+	assert sweep.data(1).shape == (5, 2)
+	assert np.allclose(sweep.data(1)[:, 0], x)
@@ -0,0 +1,103 @@
+import functools
+import numpy as np
+import pytest
+from mathinspector import render
+from mathinspector.plot import tiles
+from mathinspector.plot.tiles import TileCache, TILE_SIZE
+
+
+def gradient(position, size, step, scale=1):
+	""" a pixelmap whose pixels are the coordinates they were computed at """
+	w, h = int(size[0] / step), int(size[1] / step)
+	x = position[0] - size[0]/2 + step * np.arange(w)
+	y = position[1] + size[1]/2 - step * np.arange(h)
+	pixels = np.zeros((w, h, 3))
+	pixels[:, :, 0] = scale * x[:, None]
+	pixels[:, :, 1] = scale * y[None, :]
+	return pixels
+
+
+def test_level_is_the_closest_power_of_two():
+	assert tiles.level(1) == 0
+	assert tiles.level(2) == 1
+	assert tiles.level(0.25) == -2
+	assert tiles.level(3) == 2 # log2(3) = 1.58
+
+
+def test_visible_covers_the_screen():
+	# at level 0 with a step of 1, each tile is TILE_SIZE screen pixels
+	assert tiles.visible(0, 0, TILE_SIZE, TILE_SIZE, 1, 0) == [(0, 0), (1, 0), (0, 1), (1, 1)]
+	assert tiles.visible(TILE_SIZE/2, TILE_SIZE/2, TILE_SIZE - 1, TILE_SIZE - 1, 1, 0) == [(-1, -1), (0, -1), (-1, 0), (0, 0)]
+	# zooming out by a factor of 2 at the same level halves the size of the tiles on screen
+	assert len(tiles.visible(0, 0, TILE_SIZE, TILE_SIZE, 2, 0)) == 9
+	# at the matching level the tiles are the same size on screen again
+	assert tiles.visible(0, 0, TILE_SIZE, TILE_SIZE, 2, 1) == tiles.visible(0, 0, TILE_SIZE, TILE_SIZE, 1, 0)
+
+
+def test_pixelmap_key_uses_the_function_and_kwargs_of_partials():
+	a, b = functools.partial(gradient, scale=2), functools.partial(gradient, scale=2)
+	assert a is not b and tiles.pixelmap_key(a) == tiles.pixelmap_key(b)
+	assert tiles.pixelmap_key(a) != tiles.pixelmap_key(functools.partial(gradient, scale=3))
+	assert tiles.pixelmap_key(gradient) is gradient
+
+	unhashable = functools.partial(gradient, scale=np.ones(2))
+	assert tiles.pixelmap_key(unhashable) is unhashable
+
+
+def test_cache_drops_the_least_recently_used_tiles():
+	cache = TileCache(max_bytes=30)
+	cache.put("a", 1, 10)
+	cache.put("b", 2, 10)
+	cache.put("c", 3, 10)
+	assert cache.get("a") == 1 # a is now the most recently used
+	cache.put("d", 4, 10)
+	assert "b" not in cache and "a" in cache and len(cache) == 3
+	assert cache.nbytes == 30
+
+	cache.put("a", 5, 20) # replacing a tile doesn't count its old size
+	assert cache.get("a") == 5 and cache.nbytes <= 30
+	assert cache.get("b") is None
+
+	cache.clear()
+	assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_cache_keeps_a_tile_larger_than_the_limit():
+	cache = TileCache(max_bytes=10)
+	cache.put("a", 1, 100)
+	assert "a" in cache
+
+
+def test_compute_places_tiles_on_the_plane():
+	pixels = render.compute(gradient, 0, 1, 2)
+	assert pixels.shape == (TILE_SIZE, TILE_SIZE, 3)
+	# the top left pixel of tile (tx, ty) is the point (tx, -ty) * TILE_SIZE * 2**n
+	assert pixels[0, 0, 0] == TILE_SIZE and pixels[0, 0, 1] == -2 * TILE_SIZE
+	assert render.compute(gradient, 1, 1, 0)[0, 0, 0] == 2 * TILE_SIZE
+
+
+def test_computed_batch_results():
+	batch = tiles.computed("key", gradient, 0, [(0, 0), (1, 0)])
+	assert batch.done()
+	results = dict(batch.results())
+	assert set(results) == {(0, 0), (1, 0)}
+	assert results[(1, 0)][0, 0, 0] == TILE_SIZE
+
+
+@pytest.mark.skipif(render.shared_memory is None, reason="multiprocessing.shared_memory needs python 3.8")
+def test_render_writes_into_shared_memory():
+	buffer = render.shared_memory.SharedMemory(create=True, size=2 * render.SLOT_BYTES)
+	try:
+		assert render.render(buffer.name, 1, lambda *args: 255 * np.ones((TILE_SIZE, TILE_SIZE, 3)), 0, 0, 0) == (TILE_SIZE, TILE_SIZE)
+		slots = render.slots(buffer)
+		assert slots.shape[1:] == (TILE_SIZE, TILE_SIZE, 3)
+		assert (slots[1] == 255).all() and (slots[0] == 0).all()
+
+		with pytest.raises(ValueError):
+			render.render(buffer.name, 0, lambda *args: np.ones((TILE_SIZE, TILE_SIZE)), 0, 0, 0)
+	finally:
+		for i in render.attached.values():
+			i.close()
+		render.attached.clear()
+		buffer.close()
+		buffer.unlink()